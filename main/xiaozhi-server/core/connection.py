@@ -139,7 +139,8 @@ class ConnectionHandler:
         self.iot_descriptors = {}
         self.func_handler = None
 
-        self.cmd_exit = self.config["exit_commands"]
+        # 退出命令集合，按文本直接查找
+        self.cmd_exit = frozenset(self.config["exit_commands"])
 
         # 是否在聊天结束后关闭连接
         self.close_after_chat = False
@@ -1055,6 +1056,15 @@ class ConnectionHandler:
             if self.tts:
                 await self.tts.close()
 
+            # 释放非流式ASR持有的HTTP连接池；本地ASR为所有连接共享，
+            # 流式ASR沿用各自原有的清理流程，均不在此处关闭
+            if (
+                self.asr
+                and self.asr is not self._asr
+                and self.asr.interface_type == InterfaceType.NON_STREAM
+            ):
+                await self.asr.close()
+
             # 最后关闭线程池（避免阻塞）
             if self.executor:
                 try:
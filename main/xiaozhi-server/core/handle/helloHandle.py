@@ -141,10 +141,15 @@ async def wakeupWordsResponse(conn):
         # 获取当前音色
         voice = getattr(conn.tts, "voice", "default")
 
-        wav_bytes = opus_datas_to_wav_bytes(tts_result, sample_rate=16000)
-        file_path = wakeup_words_config.generate_file_path(voice)
-        with open(file_path, "wb") as f:
-            f.write(wav_bytes)
+        # 解码与写盘放到线程中执行，避免阻塞事件循环
+        def save_wakeup_audio():
+            wav_bytes = opus_datas_to_wav_bytes(tts_result, sample_rate=16000)
+            file_path = wakeup_words_config.generate_file_path(voice)
+            with open(file_path, "wb") as f:
+                f.write(wav_bytes)
+            return file_path
+
+        file_path = await asyncio.to_thread(save_wakeup_audio)
         # 更新配置
         wakeup_words_config.update_wakeup_response(voice, file_path, result)
     finally:
@@ -47,14 +47,11 @@ async def handle_user_intent(conn, text):
 
 async def check_direct_exit(conn, text):
     """检查是否有明确的退出命令"""
-    _, text = remove_punctuation_and_length(text)
-    cmd_exit = conn.cmd_exit
-    for cmd in cmd_exit:
-        if text == cmd:
-            conn.logger.bind(tag=TAG).info(f"识别到明确的退出命令: {text}")
-            await send_stt_message(conn, text)
-            await conn.close()
-            return True
+    if text in conn.cmd_exit:
+        conn.logger.bind(tag=TAG).info(f"识别到明确的退出命令: {text}")
+        await send_stt_message(conn, text)
+        await conn.close()
+        return True
     return False
 
 
@@ -1,16 +1,14 @@
-import http.client
-import json
+import httpx
+import orjson
 import asyncio
 from typing import Optional, Tuple, List
 import os
-import uuid
 import hmac
-import hashlib
 import base64
-import requests
+import threading
 from urllib import parse
 import time
-from datetime import datetime
+import calendar
 from config.logger import setup_logging
 from core.providers.asr.base import ASRProviderBase
 from core.providers.asr.dto.dto import InterfaceType
@@ -18,51 +16,80 @@ from core.providers.asr.dto.dto import InterfaceType
 TAG = __name__
 logger = setup_logging()
 
+# 阿里云接口成功状态码
+STATUS_SUCCESS = 20000000
+
+
+def _parse_utc_iso(value: str) -> int:
+    """解析固定格式的UTC时间 YYYY-MM-DDTHH:MM:SSZ，返回时间戳"""
+    if len(value) != 20 or value[10] != "T" or value[19] != "Z":
+        raise ValueError(value)
+    return calendar.timegm(
+        (
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+            0,
+            0,
+            0,
+        )
+    )
+
 
 class AccessToken:
+    def __init__(self, access_key_id, access_key_secret):
+        # 预先用签名密钥构造HMAC，每次签名时复制即可，无需重新派生内外填充
+        # digestmod使用字符串名称，走OpenSSL的快速构造路径
+        self._hmac = hmac.new(
+            bytes(access_key_secret + "&", encoding="utf-8"), digestmod="sha1"
+        )
+        # 除SignatureNonce和Timestamp外的参数固定不变，预先按字典序编码好
+        # 排序后动态参数恰好位于SignatureMethod之后
+        self._static_query = AccessToken._encode_dict(
+            {
+                "AccessKeyId": access_key_id,
+                "Action": "CreateToken",
+                "Format": "JSON",
+                "RegionId": "cn-shanghai",
+                "SignatureMethod": "HMAC-SHA1",
+            }
+        )
+
     @staticmethod
     def _encode_text(text):
-        encoded_text = parse.quote_plus(text)
-        return encoded_text.replace("+", "%20").replace("*", "%2A").replace("%7E", "~")
+        # 等价于 quote_plus 后将 + * %7E 替换为 %20 %2A ~
+        return parse.quote(text, safe="")
 
     @staticmethod
     def _encode_dict(dic):
-        keys = dic.keys()
-        dic_sorted = [(key, dic[key]) for key in sorted(keys)]
-        encoded_text = parse.urlencode(dic_sorted)
-        return encoded_text.replace("+", "%20").replace("*", "%2A").replace("%7E", "~")
+        return "&".join(
+            f"{AccessToken._encode_text(key)}={AccessToken._encode_text(dic[key])}"
+            for key in sorted(dic.keys())
+        )
 
-    @staticmethod
-    def create_token(access_key_id, access_key_secret):
-        parameters = {
-            "AccessKeyId": access_key_id,
-            "Action": "CreateToken",
-            "Format": "JSON",
-            "RegionId": "cn-shanghai",
-            "SignatureMethod": "HMAC-SHA1",
-            "SignatureNonce": str(uuid.uuid1()),
-            "SignatureVersion": "1.0",
-            "Timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "Version": "2019-02-28",
-        }
+    def create_token(self):
+        # 随机数只需保证每次签名唯一，无需uuid1读取MAC地址和时钟序列
+        nonce = os.urandom(16).hex()
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
         # 构造规范化的请求字符串
-        query_string = AccessToken._encode_dict(parameters)
-        # print('规范化的请求字符串: %s' % query_string)
-        # 构造待签名字符串
-        string_to_sign = (
-            "GET"
-            + "&"
-            + AccessToken._encode_text("/")
-            + "&"
-            + AccessToken._encode_text(query_string)
+        query_string = (
+            f"{self._static_query}"
+            f"&SignatureNonce={nonce}"
+            "&SignatureVersion=1.0"
+            f"&Timestamp={AccessToken._encode_text(timestamp)}"
+            "&Version=2019-02-28"
         )
+        # print('规范化的请求字符串: %s' % query_string)
+        # 构造待签名字符串，其中 "%2F" 为 "/" 编码后的结果
+        string_to_sign = "GET&%2F&" + AccessToken._encode_text(query_string)
         # print('待签名的字符串: %s' % string_to_sign)
         # 计算签名
-        secreted_string = hmac.new(
-            bytes(access_key_secret + "&", encoding="utf-8"),
-            bytes(string_to_sign, encoding="utf-8"),
-            hashlib.sha1,
-        ).digest()
+        signer = self._hmac.copy()
+        signer.update(bytes(string_to_sign, encoding="utf-8"))
+        secreted_string = signer.digest()
         signature = base64.b64encode(secreted_string)
         # print('签名: %s' % signature)
         # 进行URL编码
@@ -75,8 +102,8 @@ class AccessToken:
         )
         # print('url: %s' % full_url)
         # 提交HTTP GET请求
-        response = requests.get(full_url)
-        if response.ok:
+        response = httpx.get(full_url, timeout=10, follow_redirects=True)
+        if response.is_success:
             root_obj = response.json()
             key = "Token"
             if key in root_obj:
@@ -87,6 +114,94 @@ class AccessToken:
         return None, None
 
 
+class _TokenRefresher:
+    """按AccessKey共享的临时Token，同一密钥的所有连接共用一个后台刷新线程"""
+
+    def __init__(self, access_key_id, access_key_secret, refresh_margin):
+        self._access_token = AccessToken(access_key_id, access_key_secret)
+        # Token提前刷新的安全余量（秒）
+        self.refresh_margin = refresh_margin
+        self.token = None
+        self.expire_time = None
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def refresh(self):
+        """刷新Token并记录过期时间"""
+        token, expire_time_str = self._access_token.create_token()
+        if not expire_time_str:
+            raise ValueError("无法获取有效的Token过期时间")
+
+        try:
+            # 统一转换为字符串处理
+            expire_str = str(expire_time_str).strip()
+
+            if expire_str.isdigit():
+                expire_timestamp = int(expire_str)
+            else:
+                expire_timestamp = _parse_utc_iso(expire_str)
+        except Exception as e:
+            raise ValueError(f"无效的过期时间格式: {expire_str}") from e
+
+        if not token:
+            raise ValueError("无法获取有效的访问Token")
+        self.token = token
+        self.expire_time = expire_timestamp - self.refresh_margin
+
+        # 在过期前由后台线程提前刷新，避免识别请求被刷新阻塞
+        self._schedule(self.expire_time - time.time())
+
+    def _schedule(self, delay: float):
+        """安排后台Token刷新"""
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(delay, 0), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        """后台刷新Token，失败时稍后重试"""
+        try:
+            with self._lock:
+                self.refresh()
+            logger.bind(tag=TAG).debug("Token已在后台刷新")
+        except Exception as e:
+            logger.bind(tag=TAG).error(f"后台刷新Token失败: {e}")
+            self._schedule(60)
+
+    def is_expired(self):
+        # 尚未获取过Token时同样视为过期
+        return self.expire_time is None or time.time() > self.expire_time
+
+    def ensure(self):
+        """尚未获取或已过期时刷新Token，加锁避免重复请求"""
+        with self._lock:
+            if self.is_expired():
+                if self.token:
+                    logger.warning("Token已过期，正在自动刷新...")
+                self.refresh()
+
+
+_TOKEN_REFRESHERS: "dict[tuple, _TokenRefresher]" = {}
+_TOKEN_REFRESHERS_LOCK = threading.Lock()
+
+
+def _get_token_refresher(access_key_id, access_key_secret, refresh_margin):
+    """获取该AccessKey共享的Token刷新器，不存在时创建"""
+    key = (access_key_id, access_key_secret)
+    # 全局锁内只登记刷新器，不发起网络请求，避免一次缓慢的请求阻塞其他密钥
+    with _TOKEN_REFRESHERS_LOCK:
+        refresher = _TOKEN_REFRESHERS.get(key)
+        if refresher is None:
+            refresher = _TokenRefresher(
+                access_key_id, access_key_secret, refresh_margin
+            )
+            _TOKEN_REFRESHERS[key] = refresher
+    # 首次获取Token只持有该密钥自己的锁，同一密钥的并发调用等待同一次请求
+    refresher.ensure()
+    return refresher
+
+
 class ASRProvider(ASRProviderBase):
     def __init__(self, config: dict, delete_audio_file: bool):
         super().__init__()
@@ -100,69 +215,64 @@ class ASRProvider(ASRProviderBase):
         self.host = "nls-gateway-cn-shanghai.aliyuncs.com"
         self.base_url = f"https://{self.host}/stream/v1/asr"
         self.sample_rate = 16000
-        self.format = "wav"
+        # 请求体为不带文件头的原始PCM数据
+        self.format = "pcm"
+        # 复用长连接，避免每次识别都重新进行TCP+TLS握手
+        # speech_to_text每次都在新的事件循环中执行，异步客户端的连接池无法跨循环复用，
+        # 因此使用线程安全的同步客户端
+        self.client = httpx.Client(
+            base_url=f"https://{self.host}",
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60),
+        )
         self.output_dir = config.get("output_dir", "./audio_output")
         self.delete_audio_file = delete_audio_file
 
         if self.access_key_id and self.access_key_secret:
-            # 使用密钥对生成临时token
-            self._refresh_token()
+            # 使用密钥对生成临时token，同一密钥的所有连接共享Token及刷新线程
+            self._token_refresher = _get_token_refresher(
+                self.access_key_id,
+                self.access_key_secret,
+                int(config.get("token_refresh_margin", 300)),
+            )
+            self._static_token = None
         else:
             # 直接使用预生成的长期token
-            self.token = config.get("token")
-            self.expire_time = None
+            self._token_refresher = None
+            self._static_token = config.get("token")
+            if not self._static_token:
+                raise ValueError("无法获取有效的访问Token")
 
         # 确保输出目录存在
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def _refresh_token(self):
-        """刷新Token并记录过期时间"""
-        if self.access_key_id and self.access_key_secret:
-            self.token, expire_time_str = AccessToken.create_token(
-                self.access_key_id, self.access_key_secret
-            )
-            if not expire_time_str:
-                raise ValueError("无法获取有效的Token过期时间")
+    @property
+    def token(self):
+        if self._token_refresher:
+            return self._token_refresher.token
+        return self._static_token
 
-            try:
-                # 统一转换为字符串处理
-                expire_str = str(expire_time_str).strip()
-
-                if expire_str.isdigit():
-                    expire_time = datetime.fromtimestamp(int(expire_str))
-                else:
-                    expire_time = datetime.strptime(expire_str, "%Y-%m-%dT%H:%M:%SZ")
-                self.expire_time = expire_time.timestamp() - 60
-            except Exception as e:
-                raise ValueError(f"无效的过期时间格式: {expire_str}") from e
-
-        else:
-            self.expire_time = None
-
-        if not self.token:
-            raise ValueError("无法获取有效的访问Token")
+    def _ensure_token(self):
+        """Token过期时刷新"""
+        if self._token_refresher:
+            self._token_refresher.ensure()
 
     def _is_token_expired(self):
         """检查Token是否过期"""
-        if not self.expire_time:
+        if not self._token_refresher:
             return False  # 长期Token不过期
-        # 新增调试日志
-        # current_time = time.time()
-        # remaining = self.expire_time - current_time
-        # print(f"Token过期检查: 当前时间 {datetime.fromtimestamp(current_time)} | "
-        #              f"过期时间 {datetime.fromtimestamp(self.expire_time)} | "
-        #              f"剩余 {remaining:.2f}秒")
-        return time.time() > self.expire_time
-
-    def _construct_request_url(self) -> str:
-        """构造请求URL，包含参数"""
-        request = f"{self.base_url}?appkey={self.app_key}"
-        request += f"&format={self.format}"
-        request += f"&sample_rate={self.sample_rate}"
-        request += "&enable_punctuation_prediction=true"
-        request += "&enable_inverse_text_normalization=true"
-        request += "&enable_voice_detection=false"
-        return request
+        return self._token_refresher.is_expired()
+
+    def _construct_request_params(self) -> dict:
+        """构造请求参数"""
+        return {
+            "appkey": self.app_key,
+            "format": self.format,
+            "sample_rate": self.sample_rate,
+            "enable_punctuation_prediction": "true",
+            "enable_inverse_text_normalization": "true",
+            "enable_voice_detection": "false",
+        }
 
     async def _send_request(self, pcm_data: bytes) -> Optional[str]:
         """发送请求到阿里云ASR服务"""
@@ -171,32 +281,23 @@ class ASRProvider(ASRProviderBase):
             headers = {
                 "X-NLS-Token": self.token,
                 "Content-type": "application/octet-stream",
-                "Content-Length": str(len(pcm_data)),
             }
 
-            # 创建连接并发送请求
-            conn = http.client.HTTPSConnection(self.host)
-            request_url = self._construct_request_url()
-
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: conn.request(
-                    method="POST", url=request_url, body=pcm_data, headers=headers
-                ),
+            # 复用连接池发送请求
+            response = await asyncio.to_thread(
+                self.client.post,
+                "/stream/v1/asr",
+                params=self._construct_request_params(),
+                content=pcm_data,
+                headers=headers,
             )
 
-            # 获取响应
-            response = await loop.run_in_executor(None, conn.getresponse)
-            body = await loop.run_in_executor(None, response.read)
-            conn.close()
-
             # 解析响应
             try:
-                body_json = json.loads(body)
+                body_json = orjson.loads(response.content)
                 status = body_json.get("status")
 
-                if status == 20000000:
+                if status == STATUS_SUCCESS:
                     result = body_json.get("result", "")
                     logger.bind(tag=TAG).debug(f"ASR结果: {result}")
                     return result
@@ -217,8 +318,7 @@ class ASRProvider(ASRProviderBase):
     ) -> Tuple[Optional[str], Optional[str]]:
         """将语音数据转换为文本"""
         if self._is_token_expired():
-            logger.warning("Token已过期，正在自动刷新...")
-            self._refresh_token()
+            await asyncio.to_thread(self._ensure_token)
 
         file_path = None
         try:
@@ -246,3 +346,7 @@ class ASRProvider(ASRProviderBase):
         except Exception as e:
             logger.bind(tag=TAG).error(f"语音识别失败: {e}", exc_info=True)
             return "", file_path
+
+    async def close(self):
+        """释放HTTP连接池，共享的Token刷新器继续为其他连接服务"""
+        self.client.close()
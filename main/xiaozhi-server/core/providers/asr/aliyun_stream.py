@@ -1,4 +1,5 @@
 import json
+import orjson
 import time
 import uuid
 import hmac
@@ -204,7 +205,7 @@ class ASRProvider(ASRProviderBase):
             while self.asr_ws and not conn.stop_event.is_set():
                 try:
                     response = await asyncio.wait_for(self.asr_ws.recv(), timeout=1.0)
-                    result = json.loads(response)
+                    result = orjson.loads(response)
                     
                     header = result.get("header", {})
                     payload = result.get("payload", {})
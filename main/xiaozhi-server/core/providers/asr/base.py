@@ -1,6 +1,4 @@
 import os
-import io
-import wave
 import uuid
 import json
 import time
@@ -9,18 +7,20 @@ import asyncio
 import traceback
 import threading
 import opuslib_next
-import concurrent.futures
 from abc import ABC, abstractmethod
 from config.logger import setup_logging
 from typing import Optional, Tuple, List
 from core.handle.receiveAudioHandle import startToChat
 from core.handle.reportHandle import enqueue_asr_report
-from core.utils.util import remove_punctuation_and_length
+from core.utils.util import build_wav_header, remove_punctuation_and_length
 from core.handle.receiveAudioHandle import handleAudioMessage
 
 TAG = __name__
 logger = setup_logging()
 
+# 空闲的Opus解码器池，按需创建，用完重置状态后放回，避免每句话都重新初始化解码器
+_OPUS_DECODER_POOL: "queue.SimpleQueue[opuslib_next.Decoder]" = queue.SimpleQueue()
+
 
 class ASRProviderBase(ABC):
     def __init__(self):
@@ -77,19 +77,6 @@ class ASRProviderBase(ABC):
         try:
             total_start_time = time.monotonic()
             
-            # 准备音频数据
-            if conn.audio_format == "pcm":
-                pcm_data = asr_audio_task
-            else:
-                pcm_data = self.decode_opus(asr_audio_task)
-            
-            combined_pcm_data = b"".join(pcm_data)
-            
-            # 预先准备WAV数据
-            wav_data = None
-            if conn.voiceprint_provider and combined_pcm_data:
-                wav_data = self._pcm_to_wav(combined_pcm_data)
-            
             # 定义ASR任务
             def run_asr():
                 start_time = time.monotonic()
@@ -105,6 +92,8 @@ class ASRProviderBase(ABC):
                         return result
                     finally:
                         loop.close()
+                        # 工作线程会被线程池复用，不保留已关闭的事件循环
+                        asyncio.set_event_loop(None)
                 except Exception as e:
                     end_time = time.monotonic()
                     logger.bind(tag=TAG).error(f"ASR失败: {e}")
@@ -112,9 +101,17 @@ class ASRProviderBase(ABC):
             
             # 定义声纹识别任务
             def run_voiceprint():
-                if not wav_data:
-                    return None
                 try:
+                    # 声纹识别需要WAV数据，在工作线程中解码，ASR会在speech_to_text中自行解码
+                    if conn.audio_format == "pcm":
+                        pcm_data = asr_audio_task
+                    else:
+                        pcm_data = self.decode_opus(asr_audio_task)
+                    combined_pcm_data = b"".join(pcm_data)
+                    if not combined_pcm_data:
+                        return None
+                    wav_data = self._pcm_to_wav(combined_pcm_data)
+
                     loop = asyncio.new_event_loop()
                     asyncio.set_event_loop(loop)
                     try:
@@ -125,26 +122,26 @@ class ASRProviderBase(ABC):
                         return result
                     finally:
                         loop.close()
+                        # 工作线程会被线程池复用，不保留已关闭的事件循环
+                        asyncio.set_event_loop(None)
                 except Exception as e:
                     logger.bind(tag=TAG).error(f"声纹识别失败: {e}")
                     return None
             
-            # 使用线程池执行器并行运行
-            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as thread_executor:
-                asr_future = thread_executor.submit(run_asr)
-                
-                if conn.voiceprint_provider and wav_data:
-                    voiceprint_future = thread_executor.submit(run_voiceprint)
-                    
-                    # 等待两个线程都完成
-                    asr_result = asr_future.result(timeout=15)
-                    voiceprint_result = voiceprint_future.result(timeout=15)
-                    
-                    results = {"asr": asr_result, "voiceprint": voiceprint_result}
-                else:
-                    asr_result = asr_future.result(timeout=15)
-                    results = {"asr": asr_result, "voiceprint": None}
-            
+            # 在线程中并行运行，等待结果时不阻塞事件循环
+            if conn.voiceprint_provider:
+                asr_result, voiceprint_result = await asyncio.wait_for(
+                    asyncio.gather(
+                        asyncio.to_thread(run_asr), asyncio.to_thread(run_voiceprint)
+                    ),
+                    timeout=15,
+                )
+            else:
+                asr_result = await asyncio.wait_for(
+                    asyncio.to_thread(run_asr), timeout=15
+                )
+                voiceprint_result = None
+            results = {"asr": asr_result, "voiceprint": voiceprint_result}
             
             # 处理结果
             raw_text, _ = results.get("asr", ("", None))
@@ -197,37 +194,26 @@ class ASRProviderBase(ABC):
         if len(pcm_data) % 2 != 0:
             pcm_data = pcm_data[:-1]
         
-        # 创建WAV文件头
-        wav_buffer = io.BytesIO()
-        try:
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)      # 单声道
-                wav_file.setsampwidth(2)      # 16位
-                wav_file.setframerate(16000)  # 16kHz采样率
-                wav_file.writeframes(pcm_data)
-            
-            wav_buffer.seek(0)
-            wav_data = wav_buffer.read()
-            
-            return wav_data
-        except Exception as e:
-            logger.bind(tag=TAG).error(f"WAV转换失败: {e}")
-            return b""
+        return build_wav_header(len(pcm_data)) + pcm_data
 
     def stop_ws_connection(self):
         pass
 
+    async def close(self):
+        """资源清理方法"""
+        pass
+
     def save_audio_to_file(self, pcm_data: List[bytes], session_id: str) -> str:
         """PCM数据保存为WAV文件"""
         module_name = __name__.split(".")[-1]
         file_name = f"asr_{module_name}_{session_id}_{uuid.uuid4()}.wav"
         file_path = os.path.join(self.output_dir, file_name)
 
-        with wave.open(file_path, "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)  # 2 bytes = 16-bit
-            wf.setframerate(16000)
-            wf.writeframes(b"".join(pcm_data))
+        # 直接写入预先构造的文件头和PCM数据，无需经过wave模块
+        payload = b"".join(pcm_data)
+        with open(file_path, "wb") as f:
+            f.write(build_wav_header(len(payload)))
+            f.write(payload)
 
         return file_path
 
@@ -242,23 +228,31 @@ class ASRProviderBase(ABC):
     def decode_opus(opus_data: List[bytes]) -> List[bytes]:
         """将Opus音频数据解码为PCM数据"""
         try:
-            decoder = opuslib_next.Decoder(16000, 1)
+            try:
+                decoder = _OPUS_DECODER_POOL.get_nowait()
+            except queue.Empty:
+                decoder = opuslib_next.Decoder(16000, 1)
             pcm_data = []
             buffer_size = 960  # 每次处理960个采样点 (60ms at 16kHz)
             
-            for i, opus_packet in enumerate(opus_data):
-                try:
-                    if not opus_packet or len(opus_packet) == 0:
-                        continue
-                    
-                    pcm_frame = decoder.decode(opus_packet, buffer_size)
-                    if pcm_frame and len(pcm_frame) > 0:
-                        pcm_data.append(pcm_frame)
+            try:
+                for i, opus_packet in enumerate(opus_data):
+                    try:
+                        if not opus_packet or len(opus_packet) == 0:
+                            continue
                         
-                except opuslib_next.OpusError as e:
-                    logger.bind(tag=TAG).warning(f"Opus解码错误，跳过数据包 {i}: {e}")
-                except Exception as e:
-                    logger.bind(tag=TAG).error(f"音频处理错误，数据包 {i}: {e}")
+                        pcm_frame = decoder.decode(opus_packet, buffer_size)
+                        if pcm_frame and len(pcm_frame) > 0:
+                            pcm_data.append(pcm_frame)
+                            
+                    except opuslib_next.OpusError as e:
+                        logger.bind(tag=TAG).warning(f"Opus解码错误，跳过数据包 {i}: {e}")
+                    except Exception as e:
+                        logger.bind(tag=TAG).error(f"音频处理错误，数据包 {i}: {e}")
+            finally:
+                # 解码器有状态，放回池中前先重置
+                decoder.reset_state()
+                _OPUS_DECODER_POOL.put(decoder)
             
             return pcm_data
             
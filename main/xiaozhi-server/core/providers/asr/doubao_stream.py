@@ -1,4 +1,5 @@
 import json
+import orjson
 import gzip
 import uuid
 import asyncio
@@ -163,7 +164,7 @@ class ASRProvider(ASRProviderBase):
                 try:
                     response = await self.asr_ws.recv()
                     result = self.parse_response(response)
-                    logger.bind(tag=TAG).debug(f"收到ASR结果: {result}")
+                    logger.bind(tag=TAG).debug("收到ASR结果: {}", result)
 
                     if "payload_msg" in result:
                         payload = result["payload_msg"]
@@ -329,7 +330,7 @@ class ASRProvider(ASRProviderBase):
             if message_type == 0x0F:  # SERVER_ERROR_RESPONSE
                 code = int.from_bytes(res[4:8], "big", signed=False)
                 msg_length = int.from_bytes(res[8:12], "big", signed=False)
-                error_msg = json.loads(res[12:].decode("utf-8"))
+                error_msg = orjson.loads(res[12:])
                 return {
                     "code": code,
                     "msg_length": msg_length,
@@ -338,11 +339,10 @@ class ASRProvider(ASRProviderBase):
 
             # 获取JSON数据（跳过12字节头部）
             try:
-                json_data = res[12:].decode("utf-8")
-                result = json.loads(json_data)
-                logger.bind(tag=TAG).debug(f"成功解析JSON响应: {result}")
+                result = orjson.loads(res[12:])
+                logger.bind(tag=TAG).debug("成功解析JSON响应: {}", result)
                 return {"payload_msg": result}
-            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            except orjson.JSONDecodeError as e:
                 logger.bind(tag=TAG).error(f"JSON解析失败: {str(e)}")
                 logger.bind(tag=TAG).error(f"原始数据: {res}")
                 raise
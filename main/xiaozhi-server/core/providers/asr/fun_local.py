@@ -1,7 +1,5 @@
 import time
 import os
-import sys
-import io
 import psutil
 from config.logger import setup_logging
 from typing import Optional, Tuple, List
@@ -10,6 +8,7 @@ from funasr import AutoModel
 from funasr.utils.postprocess_utils import rich_transcription_postprocess
 import shutil
 from core.providers.asr.dto.dto import InterfaceType
+from core.utils.capture_output import CaptureOutput
 
 TAG = __name__
 logger = setup_logging()
@@ -18,23 +17,6 @@ MAX_RETRIES = 2
 RETRY_DELAY = 1  # 重试延迟（秒）
 
 
-# 捕获标准输出
-class CaptureOutput:
-    def __enter__(self):
-        self._output = io.StringIO()
-        self._original_stdout = sys.stdout
-        sys.stdout = self._output
-
-    def __exit__(self, exc_type, exc_value, traceback):
-        sys.stdout = self._original_stdout
-        self.output = self._output.getvalue()
-        self._output.close()
-
-        # 将捕获到的内容通过 logger 输出
-        if self.output:
-            logger.bind(tag=TAG).info(self.output.strip())
-
-
 class ASRProvider(ASRProviderBase):
     def __init__(self, config: dict, delete_audio_file: bool):
         super().__init__()
@@ -52,7 +34,7 @@ class ASRProvider(ASRProviderBase):
 
         # 确保输出目录存在
         os.makedirs(self.output_dir, exist_ok=True)
-        with CaptureOutput():
+        with CaptureOutput(TAG):
             self.model = AutoModel(
                 model=self.model_dir,
                 vad_kwargs={"max_single_segment_time": 30000},
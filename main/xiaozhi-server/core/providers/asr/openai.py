@@ -18,6 +18,9 @@ class ASRProvider(ASRProviderBase):
         self.model = config.get("model_name")        
         self.output_dir = config.get("output_dir")
         self.delete_audio_file = delete_audio_file
+        # 复用长连接，避免每句话都重新建立TCP+TLS连接
+        # speech_to_text每次都运行在新的事件循环中，异步会话无法跨循环复用，因此使用同步会话
+        self.session = requests.Session()
 
         os.makedirs(self.output_dir, exist_ok=True)
 
@@ -29,13 +32,16 @@ class ASRProvider(ASRProviderBase):
                 pcm_data = opus_data
             else:
                 pcm_data = self.decode_opus(opus_data)
-            file_path = self.save_audio_to_file(pcm_data, session_id)
+            # 直接在内存中封装WAV上传，无需写入磁盘后再读回
+            wav_data = self._pcm_to_wav(b"".join(pcm_data))
 
-            logger.bind(tag=TAG).debug(
-                f"音频文件保存耗时: {time.time() - start_time:.3f}s | 路径: {file_path}"
-            )
+            # 仅在需要保留音频时写入文件
+            if not self.delete_audio_file:
+                file_path = self.save_audio_to_file(pcm_data, session_id)
+                logger.bind(tag=TAG).debug(
+                    f"音频文件保存耗时: {time.time() - start_time:.3f}s | 路径: {file_path}"
+                )
 
-            logger.bind(tag=TAG).info(f"file path: {file_path}")
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
             }
@@ -45,22 +51,20 @@ class ASRProvider(ASRProviderBase):
                 "model": self.model
             }
 
+            files = {
+                "file": ("audio.wav", wav_data, "audio/wav")
+            }
 
-            with open(file_path, "rb") as audio_file:  # 使用with语句确保文件关闭
-                files = {
-                    "file": audio_file
-                }
-
-                start_time = time.time()
-                response = requests.post(
-                    self.api_url,
-                    files=files,
-                    data=data,
-                    headers=headers
-                )
-                logger.bind(tag=TAG).debug(
-                    f"语音识别耗时: {time.time() - start_time:.3f}s | 结果: {response.text}"
-                )
+            start_time = time.time()
+            response = self.session.post(
+                self.api_url,
+                files=files,
+                data=data,
+                headers=headers
+            )
+            logger.bind(tag=TAG).debug(
+                f"语音识别耗时: {time.time() - start_time:.3f}s | 结果: {response.text}"
+            )
 
             if response.status_code == 200:
                 text = response.json().get("text", "")
@@ -71,12 +75,7 @@ class ASRProvider(ASRProviderBase):
         except Exception as e:
             logger.bind(tag=TAG).error(f"语音识别失败: {e}")
             return "", None
-        finally:
-            # 文件清理逻辑
-            if self.delete_audio_file and file_path and os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                    logger.bind(tag=TAG).debug(f"已删除临时音频文件: {file_path}")
-                except Exception as e:
-                    logger.bind(tag=TAG).error(f"文件删除失败: {file_path} | 错误: {e}")
-        
+
+    async def close(self):
+        """释放HTTP连接池"""
+        self.session.close()
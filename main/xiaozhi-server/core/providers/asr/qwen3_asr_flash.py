@@ -8,6 +8,7 @@ import dashscope
 from config.logger import setup_logging
 from core.providers.asr.base import ASRProviderBase
 from core.providers.asr.dto.dto import InterfaceType
+from core.utils.util import build_wav_header
 
 tag = __name__
 logger = setup_logging()
@@ -40,20 +41,11 @@ class ASRProvider(ASRProviderBase):
     def _prepare_audio_file(self, pcm_data: bytes) -> str:
         """将PCM数据转换为WAV文件并返回文件路径"""
         try:
-            import wave
-            
-            # 创建临时WAV文件
+            # 创建临时WAV文件，直接写入预构建的WAV头和PCM数据
             with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_path = temp_file.name
-                
-            # 写入WAV格式
-            with wave.open(temp_path, 'wb') as wav_file:
-                wav_file.setnchannels(1)      # 单声道
-                wav_file.setsampwidth(2)      # 16位
-                wav_file.setframerate(16000)  # 16kHz采样率
-                wav_file.writeframes(pcm_data)
-                
-            return temp_path
+                temp_file.write(build_wav_header(len(pcm_data)))
+                temp_file.write(pcm_data)
+                return temp_file.name
             
         except Exception as e:
             logger.bind(tag=tag).error(f"音频文件准备失败: {e}")
@@ -78,21 +70,22 @@ class ASRProvider(ASRProviderBase):
                 logger.bind(tag=tag).warning("音频数据为空")
                 return "", None
             
-            # 准备音频文件
-            temp_file_path = self._prepare_audio_file(combined_pcm_data)
-            if not temp_file_path:
-                return "", None
-            
-            # 保存音频文件（如果需要）
+            # 需要保留音频时直接复用保存的文件，否则写入临时文件，避免重复写盘
             if not self.delete_audio_file:
                 file_path = self.save_audio_to_file(pcm_data, session_id)
+                audio_path = os.path.abspath(file_path)
+            else:
+                temp_file_path = self._prepare_audio_file(combined_pcm_data)
+                if not temp_file_path:
+                    return "", None
+                audio_path = temp_file_path
             
             # 构造请求消息
             messages = [
                 {
                     "role": "user",
                     "content": [
-                        {"audio": temp_file_path}
+                        {"audio": audio_path}
                     ]
                 }
             ]
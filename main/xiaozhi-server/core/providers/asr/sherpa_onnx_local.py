@@ -1,11 +1,16 @@
 import time
 import wave
 import os
-import sys
-import io
+import mmap
+import struct
+import threading
+import contextlib
+from collections import OrderedDict
 from config.logger import setup_logging
 from typing import Optional, Tuple, List
 from core.providers.asr.dto.dto import InterfaceType
+from core.utils.capture_output import CaptureOutput
+from core.utils.util import pcm16_to_float32
 from core.providers.asr.base import ASRProviderBase
 
 import numpy as np
@@ -16,22 +21,81 @@ from modelscope.hub.file_download import model_file_download
 TAG = __name__
 logger = setup_logging()
 
+# 已加载的识别器按 (模型路径, 模型类型, 线程数) 缓存，避免重复初始化ONNX模型
+_RECOGNIZER_CACHE: "OrderedDict[tuple, StreamBatcher]" = OrderedDict()
+_RECOGNIZER_CACHE_SIZE = 3
+_RECOGNIZER_CACHE_LOCK = threading.Lock()
+# 正在加载的模型各自持有一把锁，同一模型只加载一次，且加载期间不阻塞其他模型的获取
+_RECOGNIZER_LOAD_LOCKS: "dict[tuple, threading.Lock]" = {}
 
-# 捕获标准输出
-class CaptureOutput:
-    def __enter__(self):
-        self._output = io.StringIO()
-        self._original_stdout = sys.stdout
-        sys.stdout = self._output
+# 标准PCM WAV文件头长度
+WAV_HEADER_SIZE = 44
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        sys.stdout = self._original_stdout
-        self.output = self._output.getvalue()
-        self._output.close()
 
-        # 将捕获到的内容通过 logger 输出
-        if self.output:
-            logger.bind(tag=TAG).info(self.output.strip())
+class _BatchItem:
+    __slots__ = ("stream", "done", "lead", "error")
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.done = threading.Event()
+        self.lead = False
+        self.error = None
+
+
+class StreamBatcher:
+    """合并并发的识别请求，通过 decode_streams 批量解码（需配置 batch_decode 开启）
+
+    空闲时请求立即由当前线程解码，不引入额外等待；解码进行期间到达的请求
+    排队，由下一个执行者一次性批量解码，多路并发时可摊薄单次推理开销，
+    但同一识别器的请求不再并行解码，后到的请求需等待当前解码完成
+    """
+
+    def __init__(self, recognizer: sherpa_onnx.OfflineRecognizer):
+        self.recognizer = recognizer
+        self._lock = threading.Lock()
+        self._pending: List[_BatchItem] = []
+        self._busy = False
+
+    def decode(self, stream):
+        item = _BatchItem(stream)
+        with self._lock:
+            self._pending.append(item)
+            if not self._busy:
+                self._busy = True
+                item.lead = True
+
+        if not item.lead:
+            item.done.wait()
+            # 被唤醒时可能是结果已完成，也可能是被指定为下一个执行者
+            if not item.lead:
+                if item.error:
+                    raise item.error
+                return
+
+        # 作为执行者，一次性解码当前排队的全部请求
+        with self._lock:
+            batch, self._pending = self._pending, []
+        try:
+            self.recognizer.decode_streams([i.stream for i in batch])
+        except Exception as e:
+            for i in batch:
+                i.error = e
+
+        # 将执行权交给下一个排队的请求，避免当前线程持续为他人解码
+        with self._lock:
+            next_item = self._pending[0] if self._pending else None
+            if next_item:
+                next_item.lead = True
+            else:
+                self._busy = False
+        for i in batch:
+            if i is not item:
+                i.done.set()
+        if next_item:
+            next_item.done.set()
+
+        if item.error:
+            raise item.error
 
 
 class ASRProvider(ASRProviderBase):
@@ -42,6 +106,22 @@ class ASRProvider(ASRProviderBase):
         self.output_dir = config.get("output_dir")
         self.model_type = config.get("model_type", "sense_voice")  # 支持 paraformer
         self.delete_audio_file = delete_audio_file
+        # 是否在加载模型时捕获标准输出并转为日志（会临时替换进程全局的sys.stdout）
+        self.capture_model_stdout = str(
+            config.get("capture_model_stdout", False)
+        ).lower() in ("true", "1", "yes")
+        # ONNX推理线程数，编码器为计算密集型，适当增加线程可提升识别速度
+        num_threads = config.get("num_threads")
+        self.num_threads = (
+            int(num_threads) if num_threads else min(os.cpu_count() or 2, 4)
+        )
+        # 静音能量阈值（int16平均幅度），低于该值的音频不送入识别，0表示不检查
+        energy_threshold = config.get("energy_threshold")
+        self.energy_threshold = float(energy_threshold) if energy_threshold else 0
+        # 是否合并并发请求批量解码，默认关闭，各连接的请求并发解码互不等待
+        self.batch_decode = str(
+            config.get("batch_decode", False)
+        ).lower() in ("true", "1", "yes")
 
         # 确保输出目录存在
         os.makedirs(self.output_dir, exist_ok=True)
@@ -73,22 +153,63 @@ class ASRProvider(ASRProviderBase):
             logger.bind(tag=TAG).error(f"模型文件处理失败: {str(e)}")
             raise
 
-        with CaptureOutput():
+        self.batcher = self._get_batcher()
+        self.model = self.batcher.recognizer
+
+    def _get_batcher(self) -> StreamBatcher:
+        """从缓存获取识别器，未命中时加载并淘汰最久未使用的模型"""
+        cache_key = (self.model_path, self.model_type, self.num_threads)
+        with _RECOGNIZER_CACHE_LOCK:
+            batcher = self._get_cached_batcher(cache_key)
+            if batcher is not None:
+                return batcher
+            load_lock = _RECOGNIZER_LOAD_LOCKS.setdefault(cache_key, threading.Lock())
+
+        # 模型加载和预热耗时较长，只持有该模型的加载锁，不阻塞全局缓存
+        with load_lock:
+            with _RECOGNIZER_CACHE_LOCK:
+                # 等待期间可能已由其他实例加载完成
+                batcher = self._get_cached_batcher(cache_key)
+                if batcher is not None:
+                    return batcher
+
+            recognizer = self._load_model()
+            self._warmup(recognizer)
+            batcher = StreamBatcher(recognizer)
+
+            with _RECOGNIZER_CACHE_LOCK:
+                _RECOGNIZER_CACHE[cache_key] = batcher
+                if len(_RECOGNIZER_CACHE) > _RECOGNIZER_CACHE_SIZE:
+                    _RECOGNIZER_CACHE.popitem(last=False)
+                _RECOGNIZER_LOAD_LOCKS.pop(cache_key, None)
+            return batcher
+
+    def _get_cached_batcher(self, cache_key):
+        """查询已加载的识别器，调用方需持有 _RECOGNIZER_CACHE_LOCK"""
+        batcher = _RECOGNIZER_CACHE.get(cache_key)
+        if batcher is not None:
+            _RECOGNIZER_CACHE.move_to_end(cache_key)
+            logger.bind(tag=TAG).debug(f"复用已加载的模型: {self.model_path}")
+        return batcher
+
+    def _load_model(self) -> sherpa_onnx.OfflineRecognizer:
+        """加载sherpa-onnx识别模型"""
+        with CaptureOutput(TAG) if self.capture_model_stdout else contextlib.nullcontext():
             if self.model_type == "paraformer":
-                self.model = sherpa_onnx.OfflineRecognizer.from_paraformer(
+                return sherpa_onnx.OfflineRecognizer.from_paraformer(
                     paraformer=self.model_path,
                     tokens=self.tokens_path,
-                    num_threads=2,
+                    num_threads=self.num_threads,
                     sample_rate=16000,
                     feature_dim=80,
                     decoding_method="greedy_search",
                     debug=False,
                 )
             else:  # sense_voice
-                self.model = sherpa_onnx.OfflineRecognizer.from_sense_voice(
+                return sherpa_onnx.OfflineRecognizer.from_sense_voice(
                     model=self.model_path,
                     tokens=self.tokens_path,
-                    num_threads=2,
+                    num_threads=self.num_threads,
                     sample_rate=16000,
                     feature_dim=80,
                     decoding_method="greedy_search",
@@ -96,6 +217,17 @@ class ASRProvider(ASRProviderBase):
                     use_itn=True,
                 )
 
+    def _warmup(self, recognizer: sherpa_onnx.OfflineRecognizer):
+        """用一秒静音预热识别器，避免首个真实请求承担ONNX Runtime的初始化开销"""
+        try:
+            start_time = time.time()
+            s = recognizer.create_stream()
+            s.accept_waveform(16000, np.zeros(16000, dtype=np.float32))
+            recognizer.decode_stream(s)
+            logger.bind(tag=TAG).debug(f"模型预热耗时: {time.time() - start_time:.3f}s")
+        except Exception as e:
+            logger.bind(tag=TAG).warning(f"模型预热失败: {e}")
+
     def read_wave(self, wave_filename: str) -> Tuple[np.ndarray, int]:
         """
         Args:
@@ -109,16 +241,48 @@ class ASRProvider(ASRProviderBase):
         - sample rate of the wave file
         """
 
+        # 标准44字节头的PCM WAV（save_audio_to_file生成的格式）直接跳过头部读取采样
+        with open(wave_filename, "rb") as f:
+            header = f.read(WAV_HEADER_SIZE)
+            if (
+                len(header) == WAV_HEADER_SIZE
+                and header[0:4] == b"RIFF"
+                and header[8:16] == b"WAVEfmt "
+                and header[36:40] == b"data"
+            ):
+                fmt_size, audio_format, channels, sample_rate = struct.unpack_from(
+                    "<IHHI", header, 16
+                )
+                bits_per_sample, data_size = struct.unpack_from("<H4xI", header, 34)
+                if fmt_size == 16 and audio_format == 1 and bits_per_sample == 16:
+                    assert channels == 1, channels
+                    # 映射文件后直接从页缓存转换，省去读入int16中间数组的一次拷贝
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        count = min(data_size, len(mm) - WAV_HEADER_SIZE) // 2
+                        samples_int16 = np.frombuffer(
+                            mm, dtype=np.int16, count=count, offset=WAV_HEADER_SIZE
+                        )
+                        samples = pcm16_to_float32(samples_int16)
+                        # 关闭映射前需释放对其缓冲区的引用
+                        del samples_int16
+                    return samples, sample_rate
+
+        # 非标准头部时回退到wave模块解析
         with wave.open(wave_filename) as f:
             assert f.getnchannels() == 1, f.getnchannels()
             assert f.getsampwidth() == 2, f.getsampwidth()  # it is in bytes
             num_samples = f.getnframes()
             samples = f.readframes(num_samples)
-            samples_int16 = np.frombuffer(samples, dtype=np.int16)
-            samples_float32 = samples_int16.astype(np.float32)
+            return pcm16_to_float32(samples), f.getframerate()
 
-            samples_float32 = samples_float32 / 32768
-            return samples_float32, f.getframerate()
+    @staticmethod
+    def pcm_to_samples(pcm_data: List[bytes]) -> np.ndarray:
+        """将16位PCM数据直接转换为归一化的float32采样，无需经过WAV文件"""
+        pcm_bytes = b"".join(pcm_data)
+        # 与写入WAV时一致，丢弃不完整的末尾字节，只保留完整的16位采样
+        if len(pcm_bytes) % 2:
+            pcm_bytes = pcm_bytes[:-1]
+        return pcm16_to_float32(pcm_bytes)
 
     async def speech_to_text(
         self, opus_data: List[bytes], session_id: str, audio_format="opus"
@@ -126,23 +290,38 @@ class ASRProvider(ASRProviderBase):
         """语音转文本主处理逻辑"""
         file_path = None
         try:
-            # 保存音频文件
             start_time = time.time()
             if audio_format == "pcm":
                 pcm_data = opus_data
             else:
                 pcm_data = self.decode_opus(opus_data)
-            file_path = self.save_audio_to_file(pcm_data, session_id)
-            logger.bind(tag=TAG).debug(
-                f"音频文件保存耗时: {time.time() - start_time:.3f}s | 路径: {file_path}"
-            )
+
+            if self.delete_audio_file:
+                # 不保留音频文件时直接在内存中转换，省去WAV写入和回读
+                samples, sample_rate = self.pcm_to_samples(pcm_data), 16000
+            else:
+                # 保存音频文件
+                file_path = self.save_audio_to_file(pcm_data, session_id)
+                logger.bind(tag=TAG).debug(
+                    f"音频文件保存耗时: {time.time() - start_time:.3f}s | 路径: {file_path}"
+                )
+                samples, sample_rate = self.read_wave(file_path)
+
+            # 平均幅度过低视为静音，直接跳过识别
+            if self.energy_threshold and samples.size:
+                energy = float(np.abs(samples).mean()) * 32768
+                if energy < self.energy_threshold:
+                    logger.bind(tag=TAG).debug(f"音频能量过低({energy:.1f})，跳过识别")
+                    return "", file_path
 
             # 语音识别
             start_time = time.time()
             s = self.model.create_stream()
-            samples, sample_rate = self.read_wave(file_path)
             s.accept_waveform(sample_rate, samples)
-            self.model.decode_stream(s)
+            if self.batch_decode:
+                self.batcher.decode(s)
+            else:
+                self.model.decode_stream(s)
             text = s.result.text
             logger.bind(tag=TAG).debug(
                 f"语音识别耗时: {time.time() - start_time:.3f}s | 结果: {text}"
@@ -153,11 +332,3 @@ class ASRProvider(ASRProviderBase):
         except Exception as e:
             logger.bind(tag=TAG).error(f"语音识别失败: {e}", exc_info=True)
             return "", file_path
-        finally:
-            # 文件清理逻辑
-            if self.delete_audio_file and file_path and os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                    logger.bind(tag=TAG).debug(f"已删除临时音频文件: {file_path}")
-                except Exception as e:
-                    logger.bind(tag=TAG).error(f"文件删除失败: {file_path} | 错误: {e}")
@@ -1,4 +1,5 @@
 import json
+import orjson
 import hmac
 import base64
 import hashlib
@@ -212,8 +213,9 @@ class ASRProvider(ASRProviderBase):
                     # 如果已发送最终帧，增加超时时间等待完整结果
                     timeout = 3.0 if self.last_frame_sent else 30.0
                     response = await asyncio.wait_for(self.asr_ws.recv(), timeout=timeout)
-                    result = json.loads(response)
-                    logger.bind(tag=TAG).debug(f"收到ASR结果: {result}")
+                    result = orjson.loads(response)
+                    # 使用延迟格式化，DEBUG未开启时不会为每条中间结果格式化整个字典
+                    logger.bind(tag=TAG).debug("收到ASR结果: {}", result)
 
                     header = result.get("header", {})
                     payload = result.get("payload", {})
@@ -231,16 +233,13 @@ class ASRProvider(ASRProviderBase):
                         text_data = payload["result"]["text"]
                         if text_data:
                             # 解码base64文本
-                            decoded_text = base64.b64decode(text_data).decode('utf-8')
-                            text_json = json.loads(decoded_text)
+                            text_json = orjson.loads(base64.b64decode(text_data))
 
                             # 提取文本内容
                             text_ws = text_json.get('ws', [])
-                            result_text = ''
-                            for i in text_ws:
-                                for j in i.get("cw", []):
-                                    w = j.get("w", "")
-                                    result_text += w
+                            result_text = "".join(
+                                j.get("w", "") for i in text_ws for j in i.get("cw", [])
+                            )
 
                             # 更新识别文本 - 实时更新策略
                             if result_text and result_text.strip() not in ['', '。', '.', ',', '，']:
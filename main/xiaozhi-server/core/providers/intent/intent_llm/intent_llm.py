@@ -2,16 +2,141 @@ from typing import List, Dict
 from ..base import IntentProviderBase
 from plugins_func.functions.play_music import initialize_music_handler
 from config.logger import setup_logging
-import re
-import json
-import hashlib
+import orjson
 import time
+import asyncio
 
 TAG = __name__
 logger = setup_logging()
 
+BATCH_PROMPT_HEADER = (
+    "下面是多段相互独立的对话，请分别识别每段对话中用户最后一句话的意图。\n"
+    "必须只返回一个JSON数组，数组第i个元素是第[i]段对话按上述格式要求得到的JSON结果，"
+    "元素个数与对话段数相同，顺序一致。\n\n"
+)
+
+
+class IntentBatcher:
+    """在短时间窗口内合并系统提示词相同的意图识别请求，通过一次LLM调用完成识别
+
+    系统提示词只需发送一次，多设备并发时可显著减少提示词token；
+    批量结果无法按条解析时回退为逐条调用
+    """
+
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        # (事件循环, LLM标识, 系统提示词) -> (定时器, [(user_prompt, future), ...])
+        self._pending: Dict[tuple, tuple] = {}
+        # 持有进行中的批处理任务，避免任务未完成时被垃圾回收
+        self._tasks = set()
+
+    @staticmethod
+    def _llm_key(llm):
+        """每个连接都会创建独立的LLM实例，类型、模型、地址和密钥相同的实例视为等价，
+        以便合并不同连接的请求；无法区分的LLM按实例区分"""
+        attrs = (
+            getattr(llm, "model_name", None),
+            getattr(llm, "base_url", None),
+            getattr(llm, "api_key", None),
+        )
+        if not any(attrs):
+            return id(llm)
+        return (type(llm), *attrs)
+
+    async def submit(self, llm, system_prompt: str, user_prompt: str) -> str:
+        loop = asyncio.get_running_loop()
+        key = (loop, self._llm_key(llm), system_prompt)
+        future = loop.create_future()
+        entry = self._pending.get(key)
+        if entry is None:
+            timer = loop.call_later(self.window, self._flush, key, llm)
+            entry = self._pending[key] = (timer, [])
+        items = entry[1]
+        items.append((user_prompt, future))
+        if len(items) >= self.max_size:
+            self._flush(key, llm)
+        return await future
+
+    def _flush(self, key, llm):
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+        timer, items = entry
+        # 因达到批量上限提前执行时取消定时器，避免其提前执行同键的下一批请求
+        timer.cancel()
+        if items:
+            task = asyncio.ensure_future(self._run(llm, key[2], items))
+            self._tasks.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.bind(tag=TAG).error(f"批量意图识别任务异常: {task.exception()}")
+
+    async def _run(self, llm, system_prompt: str, items: list):
+        try:
+            if len(items) > 1:
+                results = await self._run_batch(llm, system_prompt, items)
+            else:
+                results = None
+            if results is None:
+                results = await asyncio.gather(
+                    *(
+                        asyncio.to_thread(
+                            llm.response_no_stream,
+                            system_prompt=system_prompt,
+                            user_prompt=user_prompt,
+                        )
+                        for user_prompt, _ in items
+                    ),
+                    return_exceptions=True,
+                )
+        except Exception as e:
+            results = [e] * len(items)
+
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _run_batch(self, llm, system_prompt: str, items: list):
+        user_prompt = BATCH_PROMPT_HEADER + "\n".join(
+            f"[{i}]\n{prompt}" for i, (prompt, _) in enumerate(items)
+        )
+        try:
+            response = await asyncio.to_thread(
+                llm.response_no_stream,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+            start = response.find("[")
+            end = response.rfind("]")
+            results = orjson.loads(response[start : end + 1]) if start != -1 else None
+        except Exception as e:
+            logger.bind(tag=TAG).warning(f"批量意图识别失败，回退为逐条识别: {e}")
+            return None
+        if not isinstance(results, list) or len(results) != len(items):
+            logger.bind(tag=TAG).warning("批量意图识别结果数量不匹配，回退为逐条识别")
+            return None
+        logger.bind(tag=TAG).debug(f"批量意图识别完成，合并请求数: {len(items)}")
+        return [orjson.dumps(result).decode() for result in results]
+
+
+# 各连接的意图识别实例共享批处理器，才能合并不同设备的请求；
+# 按 (合并窗口, 批量上限) 区分，不同配置（包括重新加载的配置）各自生效
+_BATCHERS: Dict[tuple, IntentBatcher] = {}
+
 
 class IntentProvider(IntentProviderBase):
+    # 系统提示词只取决于可用函数，按完整函数定义跨连接共享，避免每个新连接重复拼接
+    _PROMPT_CACHE: Dict[bytes, str] = {}
+    _PROMPT_CACHE_SIZE = 32
+
     def __init__(self, config):
         super().__init__(config)
         self.llm = None
@@ -22,6 +147,12 @@ class IntentProvider(IntentProviderBase):
         self.cache_manager = cache_manager
         self.CacheType = CacheType
         self.history_count = 4  # 默认使用最近4条对话记录
+        # 批量意图识别的合并窗口（毫秒），0表示不合并，每条请求单独调用LLM
+        self.batch_window_ms = float(config.get("batch_window_ms", 0) or 0)
+        self.batch_max_size = int(config.get("batch_max_size", 8) or 8)
+        # 拼接好的完整系统提示词及其依赖项，依赖项不变时直接复用
+        self._prompt_key = None
+        self._prompt_full = ""
 
     def get_intent_system_prompt(self, functions_list: str) -> str:
         """
@@ -32,25 +163,32 @@ class IntentProvider(IntentProviderBase):
             格式化后的系统提示词
         """
 
-        # 构建函数说明部分
-        functions_desc = "可用的函数列表：\n"
-        for func in functions_list:
+        # 提示词包含函数描述和参数，同名函数在不同设备上的描述可能不同（如IoT、MCP工具），
+        # 因此以完整的函数定义作为缓存键
+        signature = orjson.dumps(functions_list or [], option=orjson.OPT_SORT_KEYS)
+        prompt = IntentProvider._PROMPT_CACHE.get(signature)
+        if prompt is not None:
+            return prompt
+
+        # 构建函数说明部分，各片段先收集到列表中，最后一次拼接
+        parts = ["可用的函数列表：\n"]
+        for func in functions_list or ():
             func_info = func.get("function", {})
             name = func_info.get("name", "")
             desc = func_info.get("description", "")
             params = func_info.get("parameters", {})
 
-            functions_desc += f"\n函数名: {name}\n"
-            functions_desc += f"描述: {desc}\n"
+            parts.append(f"\n函数名: {name}\n描述: {desc}\n")
 
             if params:
-                functions_desc += "参数:\n"
+                parts.append("参数:\n")
                 for param_name, param_info in params.get("properties", {}).items():
                     param_desc = param_info.get("description", "")
                     param_type = param_info.get("type", "")
-                    functions_desc += f"- {param_name} ({param_type}): {param_desc}\n"
+                    parts.append(f"- {param_name} ({param_type}): {param_desc}\n")
 
-            functions_desc += "---\n"
+            parts.append("---\n")
+        functions_desc = "".join(parts)
 
         prompt = (
             "【严格格式要求】你必须只能返回JSON格式，绝对不能返回任何自然语言！\n\n"
@@ -113,8 +251,20 @@ class IntentProvider(IntentProviderBase):
             "- 示例：{'function_calls': [{name:'light_on'}, {name:'volume_up'}]}\n\n"
             "【最终警告】绝对禁止输出任何自然语言、表情符号或解释文字！只能输出有效JSON格式！违反此规则将导致系统错误！"
         )
+        if len(IntentProvider._PROMPT_CACHE) >= IntentProvider._PROMPT_CACHE_SIZE:
+            IntentProvider._PROMPT_CACHE.pop(next(iter(IntentProvider._PROMPT_CACHE)))
+        IntentProvider._PROMPT_CACHE[signature] = prompt
         return prompt
 
+    def _get_batcher(self) -> IntentBatcher:
+        key = (self.batch_window_ms, self.batch_max_size)
+        batcher = _BATCHERS.get(key)
+        if batcher is None:
+            batcher = _BATCHERS[key] = IntentBatcher(
+                self.batch_window_ms / 1000, self.batch_max_size
+            )
+        return batcher
+
     def replyResult(self, text: str, original_text: str):
         llm_result = self.llm.response_no_stream(
             system_prompt=text,
@@ -136,8 +286,8 @@ class IntentProvider(IntentProviderBase):
         model_info = getattr(self.llm, "model_name", str(self.llm.__class__.__name__))
         logger.bind(tag=TAG).debug(f"使用意图识别模型: {model_info}")
 
-        # 计算缓存键
-        cache_key = hashlib.md5((conn.device_id + text).encode()).hexdigest()
+        # 计算缓存键，缓存位于进程内，直接以元组为键，无需计算哈希摘要
+        cache_key = (conn.device_id, text)
 
         # 检查缓存
         cached_intent = self.cache_manager.get(self.CacheType.INTENT, cache_key)
@@ -161,31 +311,33 @@ class IntentProvider(IntentProviderBase):
 
         music_config = initialize_music_handler(conn)
         music_file_names = music_config["music_file_names"]
-        prompt_music = f"{self.promot}\n<musicNames>{music_file_names}\n</musicNames>"
 
         home_assistant_cfg = conn.config["plugins"].get("home_assistant")
         if home_assistant_cfg:
             devices = home_assistant_cfg.get("devices", [])
         else:
             devices = []
-        if len(devices) > 0:
-            hass_prompt = "\n下面是我家智能设备列表（位置，设备名，entity_id），可以通过homeassistant控制\n"
-            for device in devices:
-                hass_prompt += device + "\n"
-            prompt_music += hass_prompt
-
-        logger.bind(tag=TAG).debug(f"User prompt: {prompt_music}")
 
-        # 构建用户对话历史的提示
-        msgStr = ""
-
-        # 获取最近的对话历史
+        # 仅在基础提示词、音乐列表或设备列表变化时重新拼接
+        prompt_key = (self.promot, music_file_names, tuple(devices))
+        if prompt_key != self._prompt_key:
+            prompt_music = f"{self.promot}\n<musicNames>{music_file_names}\n</musicNames>"
+            if len(devices) > 0:
+                hass_prompt = "\n下面是我家智能设备列表（位置，设备名，entity_id），可以通过homeassistant控制\n"
+                hass_prompt += "".join(f"{device}\n" for device in devices)
+                prompt_music += hass_prompt
+            self._prompt_key = prompt_key
+            self._prompt_full = prompt_music
+            logger.bind(tag=TAG).debug("User prompt: {}", prompt_music)
+        prompt_music = self._prompt_full
+
+        # 构建用户对话历史的提示，取最近的对话历史一次性拼接
         start_idx = max(0, len(dialogue_history) - self.history_count)
-        for i in range(start_idx, len(dialogue_history)):
-            msgStr += f"{dialogue_history[i].role}: {dialogue_history[i].content}\n"
-
-        msgStr += f"User: {text}\n"
-        user_prompt = f"current dialogue:\n{msgStr}"
+        msgStr = "".join(
+            f"{dialogue_history[i].role}: {dialogue_history[i].content}\n"
+            for i in range(start_idx, len(dialogue_history))
+        )
+        user_prompt = f"current dialogue:\n{msgStr}User: {text}\n"
 
         # 记录预处理完成时间
         preprocess_time = time.time() - total_start_time
@@ -195,9 +347,14 @@ class IntentProvider(IntentProviderBase):
         llm_start_time = time.time()
         logger.bind(tag=TAG).debug(f"开始LLM意图识别调用, 模型: {model_info}")
 
-        intent = self.llm.response_no_stream(
-            system_prompt=prompt_music, user_prompt=user_prompt
-        )
+        if self.batch_window_ms > 0:
+            intent = await self._get_batcher().submit(
+                self.llm, prompt_music, user_prompt
+            )
+        else:
+            intent = self.llm.response_no_stream(
+                system_prompt=prompt_music, user_prompt=user_prompt
+            )
 
         # 记录LLM调用完成时间
         llm_time = time.time() - llm_start_time
@@ -210,10 +367,11 @@ class IntentProvider(IntentProviderBase):
 
         # 清理和解析响应
         intent = intent.strip()
-        # 尝试提取JSON部分
-        match = re.search(r"\{.*\}", intent, re.DOTALL)
-        if match:
-            intent = match.group(0)
+        # 尝试提取JSON部分（第一个"{"到最后一个"}"，与贪婪匹配 \{.*\} 结果一致，无需正则回溯）
+        json_start = intent.find("{")
+        json_end = intent.rfind("}")
+        if json_start != -1 and json_end > json_start:
+            intent = intent[json_start : json_end + 1]
 
         # 记录总处理时间
         total_time = time.time() - total_start_time
@@ -223,7 +381,7 @@ class IntentProvider(IntentProviderBase):
 
         # 尝试解析为JSON
         try:
-            intent_data = json.loads(intent)
+            intent_data = orjson.loads(intent)
             # 如果包含function_call，则格式化为适合处理的格式
             if "function_call" in intent_data:
                 function_data = intent_data["function_call"]
@@ -259,7 +417,7 @@ class IntentProvider(IntentProviderBase):
             postprocess_time = time.time() - postprocess_start_time
             logger.bind(tag=TAG).debug(f"意图后处理耗时: {postprocess_time:.4f}秒")
             return intent
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # 后处理时间
             postprocess_time = time.time() - postprocess_start_time
             logger.bind(tag=TAG).error(
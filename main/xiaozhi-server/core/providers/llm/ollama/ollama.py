@@ -7,6 +7,72 @@ TAG = __name__
 logger = setup_logging()
 
 
+class ThinkTagFilter:
+    """流式过滤 <think>...</think> 思考内容
+
+    每个chunk只扫描新到达的数据，思考内容直接丢弃，不在缓冲区中累积
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self.in_think = False
+        # 保留末尾可能被拆分到下一个chunk的标签前缀
+        self._tail = ""
+
+    @staticmethod
+    def _partial_tag_len(text: str, tag: str) -> int:
+        """返回text末尾与tag开头重合的长度"""
+        for n in range(min(len(tag) - 1, len(text)), 0, -1):
+            if text.endswith(tag[:n]):
+                return n
+        return 0
+
+    def feed(self, content: str) -> str:
+        text = self._tail + content if self._tail else content
+        self._tail = ""
+        parts = []
+        pos = 0
+        while pos < len(text):
+            if self.in_think:
+                end = text.find(self.CLOSE_TAG, pos)
+                if end == -1:
+                    self._tail = text[max(pos, len(text) - len(self.CLOSE_TAG) + 1) :]
+                    break
+                self.in_think = False
+                pos = end + len(self.CLOSE_TAG)
+                continue
+
+            start = text.find(self.OPEN_TAG, pos)
+            end = text.find(self.CLOSE_TAG, pos)
+            if end != -1 and (start == -1 or end < start):
+                # 只有结束标签，丢弃其之前的内容
+                parts.clear()
+                pos = end + len(self.CLOSE_TAG)
+            elif start == -1:
+                rest = text[pos:]
+                hold = max(
+                    self._partial_tag_len(rest, self.OPEN_TAG),
+                    self._partial_tag_len(rest, self.CLOSE_TAG),
+                )
+                if hold:
+                    self._tail = rest[-hold:]
+                    rest = rest[:-hold]
+                parts.append(rest)
+                break
+            else:
+                parts.append(text[pos:start])
+                self.in_think = True
+                pos = start + len(self.OPEN_TAG)
+        return "".join(parts)
+
+    def flush(self) -> str:
+        """流结束时输出保留的非思考内容"""
+        tail, self._tail = self._tail, ""
+        return "" if self.in_think else tail
+
+
 class LLMProvider(LLMProviderBase):
     def __init__(self, config):
         self.model_name = config.get("model_name")
@@ -24,32 +90,42 @@ class LLMProvider(LLMProviderBase):
         # 检查是否是qwen3模型
         self.is_qwen3 = self.model_name and self.model_name.lower().startswith("qwen3")
 
+    NO_THINK_PREFIX = "/no_think "
+
+    @staticmethod
+    def _inject_no_think(dialogue):
+        """在每条用户消息前添加/no_think指令，返回新的对话列表，不修改原始消息
+
+        历史用户消息与其作为最后一条发送时保持一致，使本轮请求以上一轮请求为前缀，
+        Ollama可复用已缓存的KV，只需计算新增部分
+        """
+        prefix = LLMProvider.NO_THINK_PREFIX
+        result = None
+        for i, msg in enumerate(dialogue):
+            content = msg.get("content")
+            if (
+                msg.get("role") != "user"
+                or not isinstance(content, str)
+                or content.startswith(prefix)
+            ):
+                continue
+            # 遇到第一条需要修改的消息时才复制列表，已全部带指令时直接返回原列表
+            if result is None:
+                result = list(dialogue)
+            result[i] = {**msg, "content": prefix + content}
+        return dialogue if result is None else result
+
     def response(self, session_id, dialogue, **kwargs):
         try:
-            # 如果是qwen3模型，在用户最后一条消息中添加/no_think指令
+            # 如果是qwen3模型，在用户消息中添加/no_think指令
             if self.is_qwen3:
-                # 复制对话列表，避免修改原始对话
-                dialogue_copy = dialogue.copy()
-
-                # 找到最后一条用户消息
-                for i in range(len(dialogue_copy) - 1, -1, -1):
-                    if dialogue_copy[i]["role"] == "user":
-                        # 在用户消息前添加/no_think指令
-                        dialogue_copy[i]["content"] = (
-                            "/no_think " + dialogue_copy[i]["content"]
-                        )
-                        logger.bind(tag=TAG).debug(f"为qwen3模型添加/no_think指令")
-                        break
-
-                # 使用修改后的对话
-                dialogue = dialogue_copy
+                dialogue = self._inject_no_think(dialogue)
 
             responses = self.client.chat.completions.create(
                 model=self.model_name, messages=dialogue, stream=True
             )
-            is_active = True
             # 用于处理跨chunk的标签
-            buffer = ""
+            think_filter = ThinkTagFilter()
 
             for chunk in responses:
                 try:
@@ -61,57 +137,27 @@ class LLMProvider(LLMProviderBase):
                     content = delta.content if hasattr(delta, "content") else ""
 
                     if content:
-                        # 将内容添加到缓冲区
-                        buffer += content
-
-                        # 处理缓冲区中的标签
-                        while "<think>" in buffer and "</think>" in buffer:
-                            # 找到完整的<think></think>标签并移除
-                            pre = buffer.split("<think>", 1)[0]
-                            post = buffer.split("</think>", 1)[1]
-                            buffer = pre + post
-
-                        # 处理只有开始标签的情况
-                        if "<think>" in buffer:
-                            is_active = False
-                            buffer = buffer.split("<think>", 1)[0]
-
-                        # 处理只有结束标签的情况
-                        if "</think>" in buffer:
-                            is_active = True
-                            buffer = buffer.split("</think>", 1)[1]
-
-                        # 如果当前处于活动状态且缓冲区有内容，则输出
-                        if is_active and buffer:
-                            yield buffer
-                            buffer = ""  # 清空缓冲区
+                        # 过滤思考内容，只输出正式回复
+                        content = think_filter.feed(content)
+                        if content:
+                            yield content
 
                 except Exception as e:
                     logger.bind(tag=TAG).error(f"Error processing chunk: {e}")
 
+            tail = think_filter.flush()
+            if tail:
+                yield tail
+
         except Exception as e:
             logger.bind(tag=TAG).error(f"Error in Ollama response generation: {e}")
             yield "【Ollama服务响应异常】"
 
     def response_with_functions(self, session_id, dialogue, functions=None):
         try:
-            # 如果是qwen3模型，在用户最后一条消息中添加/no_think指令
+            # 如果是qwen3模型，在用户消息中添加/no_think指令
             if self.is_qwen3:
-                # 复制对话列表，避免修改原始对话
-                dialogue_copy = dialogue.copy()
-
-                # 找到最后一条用户消息
-                for i in range(len(dialogue_copy) - 1, -1, -1):
-                    if dialogue_copy[i]["role"] == "user":
-                        # 在用户消息前添加/no_think指令
-                        dialogue_copy[i]["content"] = (
-                            "/no_think " + dialogue_copy[i]["content"]
-                        )
-                        logger.bind(tag=TAG).debug(f"为qwen3模型添加/no_think指令")
-                        break
-
-                # 使用修改后的对话
-                dialogue = dialogue_copy
+                dialogue = self._inject_no_think(dialogue)
 
             stream = self.client.chat.completions.create(
                 model=self.model_name,
@@ -120,8 +166,8 @@ class LLMProvider(LLMProviderBase):
                 tools=functions,
             )
 
-            is_active = True
-            buffer = ""
+            # 用于处理跨chunk的标签
+            think_filter = ThinkTagFilter()
 
             for chunk in stream:
                 try:
@@ -142,34 +188,18 @@ class LLMProvider(LLMProviderBase):
 
                     # 处理文本内容
                     if content:
-                        # 将内容添加到缓冲区
-                        buffer += content
-
-                        # 处理缓冲区中的标签
-                        while "<think>" in buffer and "</think>" in buffer:
-                            # 找到完整的<think></think>标签并移除
-                            pre = buffer.split("<think>", 1)[0]
-                            post = buffer.split("</think>", 1)[1]
-                            buffer = pre + post
-
-                        # 处理只有开始标签的情况
-                        if "<think>" in buffer:
-                            is_active = False
-                            buffer = buffer.split("<think>", 1)[0]
-
-                        # 处理只有结束标签的情况
-                        if "</think>" in buffer:
-                            is_active = True
-                            buffer = buffer.split("</think>", 1)[1]
-
-                        # 如果当前处于活动状态且缓冲区有内容，则输出
-                        if is_active and buffer:
-                            yield buffer, None
-                            buffer = ""  # 清空缓冲区
+                        # 过滤思考内容，只输出正式回复
+                        content = think_filter.feed(content)
+                        if content:
+                            yield content, None
                 except Exception as e:
                     logger.bind(tag=TAG).error(f"Error processing function chunk: {e}")
                     continue
 
+            tail = think_filter.flush()
+            if tail:
+                yield tail, None
+
         except Exception as e:
             logger.bind(tag=TAG).error(f"Error in Ollama function call: {e}")
             yield f"【Ollama服务响应异常: {str(e)}】", None
@@ -1,7 +1,8 @@
 from ..base import MemoryProviderBase, logger
 import time
-import json
 import os
+import threading
+import orjson
 import yaml
 from config.config_loader import get_project_dir
 from config.manage_api_client import save_mem_local_short
@@ -94,7 +95,7 @@ def extract_json_data(json_code):
     # print("start:", start, "end:", end)
     if start == -1 or end == -1:
         try:
-            jsonData = json.loads(json_code)
+            jsonData = orjson.loads(json_code)
             return json_code
         except Exception as e:
             print("Error:", e)
@@ -105,13 +106,53 @@ def extract_json_data(json_code):
 
 TAG = __name__
 
+# 读取旧版YAML记忆文件时优先使用libyaml的C实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# 已解析的记忆文件按路径缓存 (st_mtime_ns, all_memory)，文件未变化时不再重复解析
+_MEMORY_FILE_CACHE = {}
+_MEMORY_FILE_LOCK = threading.Lock()
+
+
+def _read_all_memory(memory_path, legacy_path=None):
+    """读取全部角色的记忆，文件修改时间未变化时直接返回缓存"""
+    try:
+        mtime_ns = os.stat(memory_path).st_mtime_ns
+    except FileNotFoundError:
+        # 新文件尚不存在时从旧版YAML记忆文件迁移
+        if legacy_path and os.path.exists(legacy_path):
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                return yaml.load(f, Loader=_YamlLoader) or {}
+        return {}
+    cached = _MEMORY_FILE_CACHE.get(memory_path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    with open(memory_path, "rb") as f:
+        all_memory = orjson.loads(f.read()) or {}
+    _MEMORY_FILE_CACHE[memory_path] = (mtime_ns, all_memory)
+    return all_memory
+
+
+def _write_all_memory(memory_path, all_memory):
+    """先写临时文件再原子替换，避免写入中断导致记忆文件损坏"""
+    tmp_path = memory_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(all_memory, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, memory_path)
+    _MEMORY_FILE_CACHE[memory_path] = (os.stat(memory_path).st_mtime_ns, all_memory)
+
 
 class MemoryProvider(MemoryProviderBase):
     def __init__(self, config, summary_memory):
         super().__init__(config)
         self.short_memory = ""
         self.save_to_file = True
-        self.memory_path = get_project_dir() + "data/.memory.yaml"
+        # 记忆内容本身就是JSON字符串，直接以JSON持久化，免去YAML转义
+        self.memory_path = get_project_dir() + "data/.memory.json"
+        self.legacy_memory_path = get_project_dir() + "data/.memory.yaml"
         self.load_memory(summary_memory)
 
     def init_memory(
@@ -127,21 +168,19 @@ class MemoryProvider(MemoryProviderBase):
             self.short_memory = summary_memory
             return
 
-        all_memory = {}
-        if os.path.exists(self.memory_path):
-            with open(self.memory_path, "r", encoding="utf-8") as f:
-                all_memory = yaml.safe_load(f) or {}
+        with _MEMORY_FILE_LOCK:
+            all_memory = _read_all_memory(self.memory_path, self.legacy_memory_path)
         if self.role_id in all_memory:
             self.short_memory = all_memory[self.role_id]
 
     def save_memory_to_file(self):
-        all_memory = {}
-        if os.path.exists(self.memory_path):
-            with open(self.memory_path, "r", encoding="utf-8") as f:
-                all_memory = yaml.safe_load(f) or {}
-        all_memory[self.role_id] = self.short_memory
-        with open(self.memory_path, "w", encoding="utf-8") as f:
-            yaml.dump(all_memory, f, allow_unicode=True)
+        with _MEMORY_FILE_LOCK:
+            # 复制后再修改，写入失败时缓存仍与磁盘上的文件一致
+            all_memory = dict(
+                _read_all_memory(self.memory_path, self.legacy_memory_path)
+            )
+            all_memory[self.role_id] = self.short_memory
+            _write_all_memory(self.memory_path, all_memory)
 
     async def save_memory(self, msgs):
         # 打印使用的模型信息
@@ -181,7 +220,7 @@ class MemoryProvider(MemoryProviderBase):
             )
             json_str = extract_json_data(result)
             try:
-                json.loads(json_str)  # 检查json格式是否正确
+                orjson.loads(json_str)  # 检查json格式是否正确
                 self.short_memory = json_str
                 self.save_memory_to_file()
             except Exception as e:
@@ -1,5 +1,6 @@
 """服务端插件工具执行器"""
 
+import inspect
 from typing import Dict, Any
 from ..base import ToolType, ToolDefinition, ToolExecutor
 from plugins_func.register import all_function_registry, Action, ActionResponse
@@ -38,6 +39,10 @@ class ServerPluginExecutor(ToolExecutor):
                 # 默认不传conn参数
                 result = func_item.func(**arguments)
 
+            # 异步插件直接在当前事件循环中等待，避免阻塞事件循环
+            if inspect.isawaitable(result):
+                result = await result
+
             return result
 
         except Exception as e:
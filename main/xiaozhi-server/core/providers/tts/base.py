@@ -14,6 +14,7 @@ from abc import ABC, abstractmethod
 from config.logger import setup_logging
 from core.utils.tts import MarkdownCleaner
 from core.utils.output_counter import add_device_output
+from core.utils.cache.manager import cache_manager, CacheType
 from core.handle.reportHandle import enqueue_tts_report
 from core.handle.sendAudioHandle import sendAudioMessage
 from core.utils.util import audio_bytes_to_data_stream, audio_to_data_stream
@@ -27,6 +28,9 @@ from core.providers.tts.dto.dto import (
 TAG = __name__
 logger = setup_logging()
 
+# 仅缓存较短文本的合成结果（唤醒回复、告别语等高频短句）
+TTS_CACHE_MAX_TEXT_LEN = 50
+
 
 class TTSProviderBase(ABC):
     def __init__(self, config, delete_audio_file):
@@ -89,7 +93,7 @@ class TTSProviderBase(ABC):
             # 需要删除文件的直接转为音频数据
             while max_repeat_time > 0:
                 try:
-                    audio_bytes = asyncio.run(self.text_to_speak(text, None))
+                    audio_bytes = self._run_text_to_speak(text, None)
                     if audio_bytes:
                         self.tts_audio_queue.put((SentenceType.FIRST, None, text))
                         audio_bytes_to_data_stream(
@@ -120,7 +124,7 @@ class TTSProviderBase(ABC):
             try:
                 while not os.path.exists(tmp_file) and max_repeat_time > 0:
                     try:
-                        asyncio.run(self.text_to_speak(text, tmp_file))
+                        self._run_text_to_speak(text, tmp_file)
                     except Exception as e:
                         logger.bind(tag=TAG).warning(
                             f"语音生成失败{5 - max_repeat_time + 1}次: {text}，错误: {e}"
@@ -151,7 +155,7 @@ class TTSProviderBase(ABC):
             # 需要删除文件的直接转为音频数据
             while max_repeat_time > 0:
                 try:
-                    audio_bytes = asyncio.run(self.text_to_speak(text, None))
+                    audio_bytes = self._run_text_to_speak(text, None)
                     if audio_bytes:
                         audio_datas = []
                         audio_bytes_to_data_stream(
@@ -182,7 +186,7 @@ class TTSProviderBase(ABC):
             try:
                 while not os.path.exists(tmp_file) and max_repeat_time > 0:
                     try:
-                        asyncio.run(self.text_to_speak(text, tmp_file))
+                        self._run_text_to_speak(text, tmp_file)
                     except Exception as e:
                         logger.bind(tag=TAG).warning(
                             f"语音生成失败{5 - max_repeat_time + 1}次: {text}，错误: {e}"
@@ -210,6 +214,41 @@ class TTSProviderBase(ABC):
     async def text_to_speak(self, text, output_file):
         pass
 
+    def tts_cache_key(self, text):
+        """返回合成结果的缓存键，None表示不缓存
+
+        音色等合成参数在实例内固定的提供者可重写此方法，返回包含这些参数的元组
+        """
+        return None
+
+    def _run_text_to_speak(self, text, output_file):
+        """执行语音合成，短句命中缓存时直接复用之前的合成结果"""
+        cache_key = None
+        if len(text) <= TTS_CACHE_MAX_TEXT_LEN:
+            cache_key = self.tts_cache_key(text)
+        if cache_key is None:
+            return asyncio.run(self.text_to_speak(text, output_file))
+
+        cache_key = (self.__class__.__module__, cache_key)
+        audio_bytes = cache_manager.get(CacheType.TTS_AUDIO, cache_key)
+        if audio_bytes is not None:
+            logger.bind(tag=TAG).debug(f"使用缓存的语音合成结果: {text}")
+            if output_file is None:
+                return audio_bytes
+            with open(output_file, "wb") as f:
+                f.write(audio_bytes)
+            return None
+
+        result = asyncio.run(self.text_to_speak(text, output_file))
+        if output_file is None:
+            audio_bytes = result
+        elif os.path.exists(output_file):
+            with open(output_file, "rb") as f:
+                audio_bytes = f.read()
+        if audio_bytes:
+            cache_manager.set(CacheType.TTS_AUDIO, cache_key, audio_bytes)
+        return result
+
     def audio_to_pcm_data_stream(
         self, audio_file_path, callback: Callable[[Any], Any] = None
     ):
@@ -14,6 +14,9 @@ class TTSProvider(TTSProviderBase):
             self.voice = config.get("voice")
         self.audio_file_type = config.get("format", "mp3")
 
+    def tts_cache_key(self, text):
+        return (self.voice, self.audio_file_type, text)
+
     def generate_filename(self, extension=".mp3"):
         return os.path.join(
             self.output_file,
@@ -23,23 +26,20 @@ class TTSProvider(TTSProviderBase):
     async def text_to_speak(self, text, output_file):
         try:
             communicate = edge_tts.Communicate(text, voice=self.voice)
+            # 先收集全部音频分块，最后一次拼接，避免bytes反复拷贝和逐块写文件
+            audio_chunks = []
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":  # 只处理音频数据块
+                    audio_chunks.append(chunk["data"])
+            audio_bytes = b"".join(audio_chunks)
+
             if output_file:
-                # 确保目录存在并创建空文件
+                # 确保目录存在，以wb模式打开时已会截断原有文件
                 os.makedirs(os.path.dirname(output_file), exist_ok=True)
                 with open(output_file, "wb") as f:
-                    pass
-
-                # 流式写入音频数据
-                with open(output_file, "ab") as f:  # 改为追加模式避免覆盖
-                    async for chunk in communicate.stream():
-                        if chunk["type"] == "audio":  # 只处理音频数据块
-                            f.write(chunk["data"])
+                    f.write(audio_bytes)
             else:
                 # 返回音频二进制数据
-                audio_bytes = b""
-                async for chunk in communicate.stream():
-                    if chunk["type"] == "audio":
-                        audio_bytes += chunk["data"]
                 return audio_bytes
         except Exception as e:
             error_msg = f"Edge TTS请求失败: {e}"
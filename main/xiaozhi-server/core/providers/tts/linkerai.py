@@ -247,12 +247,13 @@ class TTSProvider(TTSProviderBase):
                     * 2
                 )
 
-                # 分帧处理PCM数据
+                # 分帧处理PCM数据，通过memoryview切片避免逐帧拷贝
+                pcm_view = memoryview(pcm_data)
                 for i in range(0, len(pcm_data), frame_bytes):
-                    frame = pcm_data[i : i + frame_bytes]
+                    frame = pcm_view[i : i + frame_bytes]
                     if len(frame) < frame_bytes:
                         # 最后一帧可能不足，用0填充
-                        frame = frame + b"\x00" * (frame_bytes - len(frame))
+                        frame = bytes(frame) + b"\x00" * (frame_bytes - len(frame))
 
                     self.opus_encoder.encode_pcm_to_opus_stream(
                         frame,
@@ -190,25 +190,30 @@ class TTSProvider(TTSProviderBase):
                     self.tts_audio_queue.put((SentenceType.FIRST, [], text))
 
                     # 处理音频流数据
-                    buffer = b""
+                    # 使用可变缓冲区原地追加和删除，避免bytes反复拼接导致的二次方复制
+                    buffer = bytearray()
+                    scan_pos = 0
                     async for chunk in resp.content.iter_any():
                         if not chunk:
                             continue
 
-                        buffer += chunk
+                        buffer.extend(chunk)
                         while True:
                             # 查找数据块分隔符
                             header_pos = buffer.find(b"data: ")
                             if header_pos == -1:
                                 break
 
-                            end_pos = buffer.find(b"\n\n", header_pos)
+                            end_pos = buffer.find(b"\n\n", max(header_pos, scan_pos))
                             if end_pos == -1:
+                                # 下次从末尾继续查找，不重复扫描已检查过的数据
+                                scan_pos = len(buffer) - 1
                                 break
 
                             # 提取单个完整JSON块
                             json_str = buffer[header_pos + 6 : end_pos].decode("utf-8")
-                            buffer = buffer[end_pos + 2 :]
+                            del buffer[: end_pos + 2]
+                            scan_pos = 0
 
                             try:
                                 data = json.loads(json_str)
@@ -322,11 +327,12 @@ class TTSProvider(TTSProviderBase):
                     * 2
                 )
 
-                # 分帧处理合并后的PCM数据
+                # 分帧处理合并后的PCM数据，通过memoryview切片避免逐帧拷贝
+                pcm_view = memoryview(pcm_data)
                 for i in range(0, len(pcm_data), frame_bytes):
-                    frame = bytes(pcm_data[i:i+frame_bytes])
+                    frame = pcm_view[i:i+frame_bytes]
                     if len(frame) < frame_bytes:
-                        frame += b"\x00" * (frame_bytes - len(frame))
+                        frame = bytes(frame) + b"\x00" * (frame_bytes - len(frame))
  
                     self.opus_encoder.encode_pcm_to_opus_stream(
                         frame,
@@ -1,4 +1,4 @@
-import requests
+import httpx
 from core.utils.util import check_model_key
 from core.providers.tts.base import TTSProviderBase
 from config.logger import setup_logging
@@ -6,6 +6,14 @@ from config.logger import setup_logging
 TAG = __name__
 logger = setup_logging()
 
+# 所有连接共享同一个线程安全的客户端连接池，后续请求复用已建立的TCP/TLS连接，省去握手耗时
+# 各连接在各自的TTS线程中调用，requests.Session并非线程安全，因此使用httpx.Client
+# 鉴权信息在每次请求的请求头中携带，因此不同api_key也可共用
+_CLIENT = httpx.Client(
+    timeout=httpx.Timeout(60, connect=10),
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+)
+
 
 class TTSProvider(TTSProviderBase):
     def __init__(self, config, delete_audio_file):
@@ -29,6 +37,9 @@ class TTSProvider(TTSProviderBase):
         if model_key_msg:
             logger.bind(tag=TAG).error(model_key_msg)
 
+    def tts_cache_key(self, text):
+        return (self.api_url, self.model, self.voice, self.speed, text)
+
     async def text_to_speak(self, text, output_file):
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -41,14 +52,18 @@ class TTSProvider(TTSProviderBase):
             "response_format": "wav",
             "speed": self.speed,
         }
-        response = requests.post(self.api_url, json=data, headers=headers)
-        if response.status_code == 200:
+        with _CLIENT.stream(
+            "POST", self.api_url, json=data, headers=headers
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                raise Exception(
+                    f"OpenAI TTS请求失败: {response.status_code} - {response.text}"
+                )
             if output_file:
+                # 边接收边写入文件，无需在内存中缓存完整音频
                 with open(output_file, "wb") as audio_file:
-                    audio_file.write(response.content)
+                    for chunk in response.iter_bytes(chunk_size=64 * 1024):
+                        audio_file.write(chunk)
             else:
-                return response.content
-        else:
-            raise Exception(
-                f"OpenAI TTS请求失败: {response.status_code} - {response.text}"
-            )
+                return response.read()
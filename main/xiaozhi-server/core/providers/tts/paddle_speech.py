@@ -1,12 +1,10 @@
-import io
-import wave
 import json
 import base64
 import asyncio
 import websockets
-import numpy as np
 from datetime import datetime
 from config.logger import setup_logging
+from core.utils.util import build_wav_header
 from core.providers.tts.base import TTSProviderBase
 
 
@@ -61,16 +59,13 @@ class TTSProvider(TTSProviderBase):
         :param bits_per_sample: 每个样本的位数，默认为16
         :return: WAV 格式的字节数据
         """
-        byte_data = np.frombuffer(pcm_data, dtype=np.int16)  # 16位PCM
-        wav_io = io.BytesIO()
-
-        with wave.open(wav_io, "wb") as wav_file:
-            wav_file.setnchannels(num_channels)
-            wav_file.setsampwidth(bits_per_sample // 8)
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(byte_data.tobytes())
-
-        return wav_io.getvalue()
+        # 直接拼接WAV头与PCM数据，无需经过wave模块和BytesIO
+        return (
+            build_wav_header(
+                len(pcm_data), sample_rate, num_channels, bits_per_sample // 8
+            )
+            + pcm_data
+        )
 
     async def text_to_speak(self, text, output_file):
         if self.protocol == "websocket":
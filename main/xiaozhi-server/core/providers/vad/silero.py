@@ -1,8 +1,8 @@
 import time
-import numpy as np
 import torch
 import opuslib_next
 from config.logger import setup_logging
+from core.utils.util import pcm16_to_float32
 from core.providers.vad.base import VADProviderBase
 
 TAG = __name__
@@ -46,11 +46,11 @@ class VADProvider(VADProviderBase):
             while len(conn.client_audio_buffer) >= 512 * 2:
                 # 提取前512个采样点（1024字节）
                 chunk = conn.client_audio_buffer[: 512 * 2]
-                conn.client_audio_buffer = conn.client_audio_buffer[512 * 2 :]
+                # 原地删除已处理部分，避免每帧重新分配整个缓冲区
+                del conn.client_audio_buffer[: 512 * 2]
 
                 # 转换为模型需要的张量格式
-                audio_int16 = np.frombuffer(chunk, dtype=np.int16)
-                audio_float32 = audio_int16.astype(np.float32) / 32768.0
+                audio_float32 = pcm16_to_float32(chunk)
                 audio_tensor = torch.from_numpy(audio_float32)
 
                 # 检测语音活动
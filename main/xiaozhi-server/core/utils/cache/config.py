@@ -19,6 +19,7 @@ class CacheType(Enum):
     CONFIG = "config"
     DEVICE_PROMPT = "device_prompt"
     VOICEPRINT_HEALTH = "voiceprint_health"  # 声纹识别健康检查
+    TTS_AUDIO = "tts_audio"  # 短句语音合成结果
 
 
 @dataclass
@@ -58,5 +59,8 @@ class CacheConfig:
             CacheType.VOICEPRINT_HEALTH: cls(
                 strategy=CacheStrategy.TTL, ttl=600, max_size=100  # 10分钟过期
             ),
+            CacheType.TTS_AUDIO: cls(
+                strategy=CacheStrategy.TTL_LRU, ttl=3600, max_size=200  # 1小时
+            ),
         }
         return configs.get(cache_type, cls())
@@ -0,0 +1,49 @@
+import io
+import sys
+from config.logger import setup_logging
+from config.config_loader import load_config
+
+TAG = __name__
+logger = setup_logging()
+
+
+def _info_log_enabled() -> bool:
+    """日志级别是否允许输出INFO日志"""
+    log_level = load_config().get("log", {}).get("log_level", "INFO")
+    try:
+        return logger.level(str(log_level).upper()).no <= logger.level("INFO").no
+    except ValueError:
+        return True
+
+
+class CaptureOutput:
+    """捕获标准输出，退出时将捕获到的内容通过 logger 输出
+
+    用于模型加载等会直接 print 的第三方库，期间会临时替换进程全局的 sys.stdout；
+    日志级别高于INFO时捕获的内容不会被输出，此时不做任何重定向
+    """
+
+    def __init__(self, tag: str = TAG):
+        self.tag = tag
+        self.output = ""
+        self._active = False
+
+    def __enter__(self):
+        self._active = _info_log_enabled()
+        if not self._active:
+            return self
+        self._output = io.StringIO()
+        self._original_stdout = sys.stdout
+        sys.stdout = self._output
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self._active:
+            return
+        sys.stdout = self._original_stdout
+        self.output = self._output.getvalue()
+        self._output.close()
+
+        # 将捕获到的内容通过 logger 输出
+        if self.output:
+            logger.bind(tag=self.tag).info(self.output.strip())
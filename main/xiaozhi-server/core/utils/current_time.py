@@ -5,6 +5,7 @@
 
 import cnlunar
 from datetime import datetime
+from functools import lru_cache
 
 WEEKDAY_MAP = {
     "Monday": "星期一",
@@ -39,18 +40,25 @@ def get_current_weekday() -> str:
     return WEEKDAY_MAP[now.strftime("%A")]
 
 
+@lru_cache(maxsize=366)
+def _lunar_date_of(date_str: str) -> str:
+    """计算指定日期的农历日期，结果按日期缓存，同一天内无需重复计算"""
+    today_lunar = cnlunar.Lunar(
+        datetime.strptime(date_str, "%Y-%m-%d"), godType="8char"
+    )
+    return "%s年%s%s" % (
+        today_lunar.lunarYearCn,
+        today_lunar.lunarMonthCn[:-1],
+        today_lunar.lunarDayCn,
+    )
+
+
 def get_current_lunar_date() -> str:
     """
     获取农历日期字符串
     """
     try:
-        now = datetime.now()
-        today_lunar = cnlunar.Lunar(now, godType="8char")
-        return "%s年%s%s" % (
-            today_lunar.lunarYearCn,
-            today_lunar.lunarMonthCn[:-1],
-            today_lunar.lunarDayCn,
-        )
+        return _lunar_date_of(get_current_date())
     except Exception:
         return "农历获取失败"
 
@@ -155,12 +155,12 @@ class PromptManager:
             if cached_weather is not None:
                 return cached_weather
 
-            # 缓存未命中，调用get_weather函数获取
-            from plugins_func.functions.get_weather import get_weather
+            # 缓存未命中，调用天气查询函数获取（当前已在工作线程中，直接同步调用）
+            from plugins_func.functions.get_weather import query_weather
             from plugins_func.register import ActionResponse
 
-            # 调用get_weather函数
-            result = get_weather(conn, location=location, lang="zh_CN")
+            # 调用天气查询函数
+            result = query_weather(conn, location=location, lang="zh_CN")
             if isinstance(result, ActionResponse):
                 weather_report = result.result
                 self.cache_manager.set(self.CacheType.WEATHER, location, weather_report)
@@ -2,7 +2,7 @@ import re
 import os
 import json
 import copy
-import wave
+import struct
 import socket
 import requests
 import subprocess
@@ -126,26 +126,20 @@ def write_json_file(file_path, data):
         json.dump(data, file, ensure_ascii=False, indent=4)
 
 
+# 全角和半角符号以及空格的删除表，模块加载时构建一次
+_PUNCTUATION_TABLE = str.maketrans(
+    "",
+    "",
+    "！＂＃＄％＆＇（）＊＋，－。／：；＜＝＞？＠［＼］＾＿｀｛｜｝～"  # 全角符号
+    + r'!"#$%&\'()*+,-./:;<=>?@[\]^_`{|}~'  # 半角符号
+    + " "  # 半角空格
+    + "　",  # 全角空格
+)
+
+
 def remove_punctuation_and_length(text):
-    # 全角符号和半角符号的Unicode范围
-    full_width_punctuations = (
-        "！＂＃＄％＆＇（）＊＋，－。／：；＜＝＞？＠［＼］＾＿｀｛｜｝～"
-    )
-    half_width_punctuations = r'!"#$%&\'()*+,-./:;<=>?@[\]^_`{|}~'
-    space = " "  # 半角空格
-    full_width_space = "　"  # 全角空格
-
-    # 去除全角和半角符号以及空格
-    result = "".join(
-        [
-            char
-            for char in text
-            if char not in full_width_punctuations
-            and char not in half_width_punctuations
-            and char not in space
-            and char not in full_width_space
-        ]
-    )
+    # 去除全角和半角符号以及空格，单次遍历完成
+    result = text.translate(_PUNCTUATION_TABLE)
 
     if result == "Yeah":
         return 0, ""
@@ -212,11 +206,51 @@ def extract_json_from_string(input_string):
     return None
 
 
-def audio_to_data_stream(audio_file_path, is_opus=True, callback: Callable[[Any], Any]=None) -> None:
+def read_pcm16_wav(wav_bytes: bytes):
+    """
+    标准44字节头的16kHz单声道16位PCM WAV直接返回其中的PCM数据，其他格式返回None
+    """
+    if (
+        len(wav_bytes) >= 44
+        and wav_bytes[0:4] == b"RIFF"
+        and wav_bytes[8:16] == b"WAVEfmt "
+        and wav_bytes[36:40] == b"data"
+    ):
+        fmt_size, audio_format, channels, sample_rate = struct.unpack_from(
+            "<IHHI", wav_bytes, 16
+        )
+        bits_per_sample, data_size = struct.unpack_from("<H4xI", wav_bytes, 34)
+        if (
+            fmt_size == 16
+            and audio_format == 1
+            and channels == 1
+            and sample_rate == 16000
+            and bits_per_sample == 16
+        ):
+            available = len(wav_bytes) - 44
+            # 流式写入的WAV可能未回填长度（0或占位的最大值），此时读到文件末尾
+            if data_size == 0 or data_size > available:
+                data_size = available - available % 2
+            return wav_bytes[44 : 44 + data_size]
+    return None
+
+
+def read_audio_file_pcm(audio_file_path) -> bytes:
+    """
+    读取音频文件并转换为单声道/16kHz采样率/16位小端PCM数据
+    """
     # 获取文件后缀名
     file_type = os.path.splitext(audio_file_path)[1]
     if file_type:
         file_type = file_type.lstrip(".")
+
+    # 已是目标格式的WAV直接读取PCM，无需启动FFmpeg解码和重采样
+    if file_type.lower() == "wav":
+        with open(audio_file_path, "rb") as f:
+            raw_data = read_pcm16_wav(f.read())
+        if raw_data is not None:
+            return raw_data
+
     # 读取音频文件，-nostdin 参数：不要从标准输入读取数据，否则FFmpeg会阻塞
     audio = AudioSegment.from_file(
         audio_file_path, format=file_type, parameters=["-nostdin"]
@@ -226,7 +260,11 @@ def audio_to_data_stream(audio_file_path, is_opus=True, callback: Callable[[Any]
     audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
 
     # 获取原始PCM数据（16位小端）
-    raw_data = audio.raw_data
+    return audio.raw_data
+
+
+def audio_to_data_stream(audio_file_path, is_opus=True, callback: Callable[[Any], Any]=None) -> None:
+    raw_data = read_audio_file_pcm(audio_file_path)
     pcm_to_data_stream(raw_data, is_opus, callback)
 
 def audio_to_data(audio_file_path: str, is_opus: bool = True) -> list[bytes]:
@@ -236,20 +274,7 @@ def audio_to_data(audio_file_path: str, is_opus: bool = True) -> list[bytes]:
         audio_file_path: 音频文件路径
         is_opus: 是否进行Opus编码
     """
-    # 获取文件后缀名
-    file_type = os.path.splitext(audio_file_path)[1]
-    if file_type:
-        file_type = file_type.lstrip(".")
-    # 读取音频文件，-nostdin 参数：不要从标准输入读取数据，否则FFmpeg会阻塞
-    audio = AudioSegment.from_file(
-        audio_file_path, format=file_type, parameters=["-nostdin"]
-    )
-
-    # 转换为单声道/16kHz采样率/16位小端编码（确保与编码器匹配）
-    audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-
-    # 获取原始PCM数据（16位小端）
-    raw_data = audio.raw_data
+    raw_data = read_audio_file_pcm(audio_file_path)
 
     # 初始化Opus编码器
     encoder = opuslib_next.Encoder(16000, 1, opuslib_next.APPLICATION_AUDIO)
@@ -288,6 +313,11 @@ def audio_bytes_to_data_stream(audio_bytes, file_type, is_opus, callback: Callab
         # 直接用p3解码
         return p3.decode_opus_from_bytes_stream(audio_bytes, callback)
     else:
+        # 已是目标格式的WAV直接取PCM数据
+        if file_type == "wav":
+            raw_data = read_pcm16_wav(audio_bytes)
+            if raw_data is not None:
+                return pcm_to_data_stream(raw_data, is_opus, callback)
         # 其他格式用pydub
         audio = AudioSegment.from_file(
             BytesIO(audio_bytes), format=file_type, parameters=["-nostdin"]
@@ -324,6 +354,42 @@ def pcm_to_data_stream(raw_data, is_opus=True, callback: Callable[[Any], Any] =
             frame_data = chunk if isinstance(chunk, bytes) else bytes(chunk)
             callback(frame_data)
 
+# int16 -> [-1, 1) 的归一化系数
+PCM16_SCALE = np.float32(1.0 / 32768)
+
+
+def pcm16_to_float32(pcm, out=None) -> np.ndarray:
+    """
+    将16位PCM数据（bytes或int16数组）转换为归一化到[-1, 1)的float32采样
+    类型转换与缩放在一次遍历中完成，不生成中间数组；可通过out复用输出数组
+    """
+    if not isinstance(pcm, np.ndarray):
+        pcm = np.frombuffer(pcm, dtype=np.int16)
+    return np.multiply(pcm, PCM16_SCALE, out=out, dtype=np.float32)
+
+
+def build_wav_header(data_size, sample_rate=16000, channels=1, sample_width=2):
+    """
+    构造标准44字节PCM WAV文件头
+    """
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt块大小
+        1,  # PCM格式
+        channels,
+        sample_rate,
+        sample_rate * channels * sample_width,  # 字节率
+        channels * sample_width,  # 块对齐
+        sample_width * 8,  # 位深
+        b"data",
+        data_size,
+    )
+
+
 def opus_datas_to_wav_bytes(opus_datas, sample_rate=16000, channels=1):
     """
     将opus帧列表解码为wav字节流
@@ -341,14 +407,8 @@ def opus_datas_to_wav_bytes(opus_datas, sample_rate=16000, channels=1):
 
     pcm_bytes = b"".join(pcm_datas)
 
-    # 写入wav字节流
-    wav_buffer = BytesIO()
-    with wave.open(wav_buffer, "wb") as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(2)  # 16bit
-        wf.setframerate(sample_rate)
-        wf.writeframes(pcm_bytes)
-    return wav_buffer.getvalue()
+    # 直接拼接WAV头与PCM数据，无需经过wave模块和BytesIO
+    return build_wav_header(len(pcm_bytes), sample_rate, channels) + pcm_bytes
 
 def check_vad_update(before_config, new_config):
     if (
@@ -30,42 +30,10 @@ get_lunar_function_desc = {
 }
 
 
-@register_function("get_lunar", get_lunar_function_desc, ToolType.WAIT)
-def get_lunar(date=None, query=None):
-    """
-    用于获取当前的阴历/农历，和天干地支、节气、生肖、星座、八字、宜忌等黄历信息
-    """
-    from core.utils.cache.manager import cache_manager, CacheType
-
-    # 如果提供了日期参数，则使用指定日期；否则使用当前日期
-    if date:
-        try:
-            now = datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            return ActionResponse(
-                Action.REQLLM,
-                f"日期格式错误，请使用YYYY-MM-DD格式，例如：2024-01-01",
-                None,
-            )
-    else:
-        now = datetime.now()
-
-    current_date = now.strftime("%Y-%m-%d")
-
-    # 如果 query 为 None，则使用默认文本
-    if query is None:
-        query = "默认查询干支年和农历日期"
-
-    # 尝试从缓存获取农历信息
-    lunar_cache_key = f"lunar_info_{current_date}"
-    cached_lunar_info = cache_manager.get(CacheType.LUNAR, lunar_cache_key)
-    if cached_lunar_info:
-        return ActionResponse(Action.REQLLM, cached_lunar_info, None)
-
-    response_text = f"根据以下信息回应用户的查询请求，并提供与{query}相关的信息：\n"
-
+def _build_lunar_block(now):
+    """生成指定日期的农历/黄历信息，与查询内容无关，可按日期缓存"""
     lunar = cnlunar.Lunar(now, godType="8char")
-    response_text += (
+    return (
         "农历信息：\n"
         "%s年%s%s\n" % (lunar.lunarYearCn, lunar.lunarMonthCn[:-1], lunar.lunarDayCn)
         + "干支: %s年 %s月 %s日\n" % (lunar.year8Char, lunar.month8Char, lunar.day8Char)
@@ -121,7 +89,42 @@ def get_lunar(date=None, query=None):
         + "(默认返回干支年和农历日期；仅在要求查询宜忌信息时才返回本日宜忌)"
     )
 
-    # 缓存农历信息
-    cache_manager.set(CacheType.LUNAR, lunar_cache_key, response_text)
+
+@register_function("get_lunar", get_lunar_function_desc, ToolType.WAIT)
+def get_lunar(date=None, query=None):
+    """
+    用于获取当前的阴历/农历，和天干地支、节气、生肖、星座、八字、宜忌等黄历信息
+    """
+    from core.utils.cache.manager import cache_manager, CacheType
+
+    # 如果提供了日期参数，则使用指定日期；否则使用当前日期
+    if date:
+        try:
+            now = datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            return ActionResponse(
+                Action.REQLLM,
+                f"日期格式错误，请使用YYYY-MM-DD格式，例如：2024-01-01",
+                None,
+            )
+    else:
+        now = datetime.now()
+
+    current_date = now.strftime("%Y-%m-%d")
+
+    # 如果 query 为 None，则使用默认文本
+    if query is None:
+        query = "默认查询干支年和农历日期"
+
+    # 农历信息只取决于日期，按日期缓存；查询内容每次单独拼接，不会被缓存的旧查询覆盖
+    lunar_cache_key = f"lunar_info_{current_date}"
+    lunar_block = cache_manager.get(CacheType.LUNAR, lunar_cache_key)
+    if not lunar_block:
+        lunar_block = _build_lunar_block(now)
+        cache_manager.set(CacheType.LUNAR, lunar_cache_key, lunar_block)
+
+    response_text = (
+        f"根据以下信息回应用户的查询请求，并提供与{query}相关的信息：\n{lunar_block}"
+    )
 
     return ActionResponse(Action.REQLLM, response_text, None)
@@ -1,4 +1,6 @@
-import requests
+import httpx
+import asyncio
+import soupsieve
 from bs4 import BeautifulSoup
 from config.logger import setup_logging
 from plugins_func.register import register_function, ToolType, ActionResponse, Action
@@ -7,6 +9,14 @@ from core.utils.util import get_ip_info
 TAG = __name__
 logger = setup_logging()
 
+# 安装了lxml时使用其C实现的解析器，解析整页天气HTML远快于纯Python的html.parser
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 GET_WEATHER_FUNCTION_DESC = {
     "type": "function",
     "function": {
@@ -40,6 +50,15 @@ HEADERS = {
     )
 }
 
+# 所有查询共享连接池，重复查询时复用已建立的TCP/TLS连接
+# 查询在工作线程中执行，httpx.Client可安全地跨线程共享
+_CLIENT = httpx.Client(
+    headers=HEADERS,
+    timeout=10,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60),
+)
+
 # 天气代码 https://dev.qweather.com/docs/resource/icons/#weather-icons
 WEATHER_CODE_MAP = {
     "100": "晴",
@@ -108,8 +127,9 @@ WEATHER_CODE_MAP = {
 
 
 def fetch_city_info(location, api_key, api_host):
-    url = f"https://{api_host}/geo/v2/city/lookup?key={api_key}&location={location}&lang=zh"
-    response = requests.get(url, headers=HEADERS).json()
+    url = f"https://{api_host}/geo/v2/city/lookup"
+    params = {"key": api_key, "location": location, "lang": "zh"}
+    response = _CLIENT.get(url, params=params).json()
     if response.get("error") is not None:
         logger.bind(tag=TAG).error(
             f"获取天气失败，原因：{response.get('error', {}).get('detail')}"
@@ -119,35 +139,44 @@ def fetch_city_info(location, api_key, api_host):
 
 
 def fetch_weather_page(url):
-    response = requests.get(url, headers=HEADERS)
-    return BeautifulSoup(response.text, "html.parser") if response.ok else None
+    response = _CLIENT.get(url)
+    return BeautifulSoup(response.text, HTML_PARSER) if response.is_success else None
+
+
+# 预编译CSS选择器，避免每次解析、每行数据都重新编译
+_SEL_CITY = soupsieve.compile("h1.c-submenu__location")
+_SEL_ABSTRACT = soupsieve.compile(".c-city-weather-current .current-abstract")
+_SEL_BASIC_ITEM = soupsieve.compile(
+    ".c-city-weather-current .current-basic .current-basic___item"
+)
+_SEL_ROW = soupsieve.compile(".city-forecast-tabs__row")
+_SEL_DATE = soupsieve.compile(".date-bg .date")
+_SEL_ICON = soupsieve.compile(".date-bg .icon")
+_SEL_TEMP = soupsieve.compile(".tmp-cont .temp")
 
 
 def parse_weather_info(soup):
-    city_name = soup.select_one("h1.c-submenu__location").get_text(strip=True)
+    city_name = _SEL_CITY.select_one(soup).get_text(strip=True)
 
-    current_abstract = soup.select_one(".c-city-weather-current .current-abstract")
+    current_abstract = _SEL_ABSTRACT.select_one(soup)
     current_abstract = (
         current_abstract.get_text(strip=True) if current_abstract else "未知"
     )
 
     current_basic = {}
-    for item in soup.select(
-        ".c-city-weather-current .current-basic .current-basic___item"
-    ):
+    for item in _SEL_BASIC_ITEM.select(soup):
         parts = item.get_text(strip=True, separator=" ").split(" ")
         if len(parts) == 2:
             key, value = parts[1], parts[0]
             current_basic[key] = value
 
     temps_list = []
-    for row in soup.select(".city-forecast-tabs__row")[:7]:  # 取前7天的数据
-        date = row.select_one(".date-bg .date").get_text(strip=True)
-        weather_code = (
-            row.select_one(".date-bg .icon")["src"].split("/")[-1].split(".")[0]
-        )
+    for row in _SEL_ROW.select(soup, limit=7):  # 取前7天的数据
+        date = _SEL_DATE.select_one(row).get_text(strip=True)
+        src = _SEL_ICON.select_one(row)["src"]
+        weather_code = src.rsplit("/", 1)[-1].split(".", 1)[0]
         weather = WEATHER_CODE_MAP.get(weather_code, "未知")
-        temps = [span.get_text(strip=True) for span in row.select(".tmp-cont .temp")]
+        temps = [span.get_text(strip=True) for span in _SEL_TEMP.select(row)]
         high_temp, low_temp = (temps[0], temps[-1]) if len(temps) >= 2 else (None, None)
         temps_list.append((date, weather, high_temp, low_temp))
 
@@ -155,7 +184,13 @@ def parse_weather_info(soup):
 
 
 @register_function("get_weather", GET_WEATHER_FUNCTION_DESC, ToolType.SYSTEM_CTL)
-def get_weather(conn, location: str = None, lang: str = "zh_CN"):
+async def get_weather(conn, location: str = None, lang: str = "zh_CN"):
+    # 网络请求和页面解析均为阻塞操作，放到工作线程中执行，避免阻塞连接的事件循环
+    return await asyncio.to_thread(query_weather, conn, location, lang)
+
+
+def query_weather(conn, location: str = None, lang: str = "zh_CN"):
+    """同步查询天气，返回ActionResponse"""
     from core.utils.cache.manager import cache_manager, CacheType
 
     api_host = conn.config["plugins"]["get_weather"].get(
@@ -1,12 +1,25 @@
 from plugins_func.register import register_function, ToolType, ActionResponse, Action
-from plugins_func.functions.hass_init import initialize_hass_handler
+from plugins_func.functions.hass_init import (
+    HASS_REQUEST_TIMEOUT,
+    initialize_hass_handler,
+    get_hass_session,
+)
 from config.logger import setup_logging
 import asyncio
-import requests
+import aiohttp
 
 TAG = __name__
 logger = setup_logging()
 
+# 需要播报的设备属性及其说明，按顺序拼接到查询结果中
+HASS_STATE_ATTRIBUTES = (
+    ("media_title", "正在播放的是:"),
+    ("volume_level", "音量是:"),
+    ("color_temp_kelvin", "色温是:"),
+    ("rgb_color", "rgb颜色是:"),
+    ("brightness", "亮度是:"),
+)
+
 hass_get_state_function_desc = {
     "type": "function",
     "function": {
@@ -27,9 +40,11 @@ hass_get_state_function_desc = {
 
 
 @register_function("hass_get_state", hass_get_state_function_desc, ToolType.SYSTEM_CTL)
-def hass_get_state(conn, entity_id=""):
+async def hass_get_state(conn, entity_id=""):
     try:
-        ha_response = handle_hass_get_state(conn, entity_id)
+        ha_response = await asyncio.wait_for(
+            handle_hass_get_state(conn, entity_id), HASS_REQUEST_TIMEOUT
+        )
         return ActionResponse(Action.REQLLM, ha_response, None)
     except asyncio.TimeoutError:
         logger.bind(tag=TAG).error("获取Home Assistant状态超时")
@@ -40,56 +55,26 @@ def hass_get_state(conn, entity_id=""):
         return ActionResponse(Action.ERROR, error_msg, None)
 
 
-def handle_hass_get_state(conn, entity_id):
+async def handle_hass_get_state(conn, entity_id):
     ha_config = initialize_hass_handler(conn)
     api_key = ha_config.get("api_key")
     base_url = ha_config.get("base_url")
     url = f"{base_url}/api/states/{entity_id}"
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers, timeout=5)
-    if response.status_code == 200:
-        responsetext = "设备状态:" + response.json()["state"] + " "
-        logger.bind(tag=TAG).info(f"api返回内容: {response.json()}")
-
-        if "media_title" in response.json()["attributes"]:
-            responsetext = (
-                responsetext
-                + "正在播放的是:"
-                + str(response.json()["attributes"]["media_title"])
-                + " "
-            )
-        if "volume_level" in response.json()["attributes"]:
-            responsetext = (
-                responsetext
-                + "音量是:"
-                + str(response.json()["attributes"]["volume_level"])
-                + " "
-            )
-        if "color_temp_kelvin" in response.json()["attributes"]:
-            responsetext = (
-                responsetext
-                + "色温是:"
-                + str(response.json()["attributes"]["color_temp_kelvin"])
-                + " "
-            )
-        if "rgb_color" in response.json()["attributes"]:
-            responsetext = (
-                responsetext
-                + "rgb颜色是:"
-                + str(response.json()["attributes"]["rgb_color"])
-                + " "
-            )
-        if "brightness" in response.json()["attributes"]:
-            responsetext = (
-                responsetext
-                + "亮度是:"
-                + str(response.json()["attributes"]["brightness"])
-                + " "
-            )
+    async with get_hass_session().get(
+        url, headers=headers, timeout=aiohttp.ClientTimeout(total=5)
+    ) as response:
+        status = response.status
+        json_data = await response.json() if status == 200 else None
+    if status == 200:
+        logger.bind(tag=TAG).info(f"api返回内容: {json_data}")
+        attributes = json_data.get("attributes", {})
+        parts = ["设备状态:", json_data["state"], " "]
+        for key, label in HASS_STATE_ATTRIBUTES:
+            if key in attributes:
+                parts += (label, str(attributes[key]), " ")
+        responsetext = "".join(parts)
         logger.bind(tag=TAG).info(f"查询返回内容: {responsetext}")
         return responsetext
-        # return response.json()['attributes']
-        # response.attributes
-
     else:
-        return f"切换失败，错误码: {response.status_code}"
+        return f"切换失败，错误码: {status}"
@@ -1,9 +1,18 @@
+import asyncio
+import aiohttp
 from config.logger import setup_logging
 from core.utils.util import check_model_key
 
 TAG = __name__
 logger = setup_logging()
 
+# 单次Home Assistant插件调用的总超时（秒），超时后取消请求并释放连接
+HASS_REQUEST_TIMEOUT = 10
+
+# Home Assistant插件共用的HTTP连接池，同一事件循环内复用连接，避免每次请求都重新握手
+_session = None
+_session_loop = None
+
 
 def append_devices_to_prompt(conn):
     if conn.intent_type == "function_call":
@@ -50,3 +59,17 @@ def initialize_hass_handler(conn):
         logger.bind(tag=TAG).error(model_key_msg)
 
     return ha_config
+
+
+def get_hass_session() -> aiohttp.ClientSession:
+    """获取当前事件循环中共享的ClientSession，不存在或已关闭时创建"""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32, limit_per_host=10, ttl_dns_cache=300, keepalive_timeout=30
+            )
+        )
+        _session_loop = loop
+    return _session
@@ -2,18 +2,20 @@ import os
 import re
 import time
 import random
-import difflib
 import traceback
-from pathlib import Path
 from core.handle.sendAudioHandle import send_stt_message
 from plugins_func.register import register_function, ToolType, ActionResponse, Action
 from core.utils.dialogue import Message
 from core.providers.tts.dto.dto import TTSMessageDTO, SentenceType, ContentType
+from rapidfuzz import fuzz, process as fuzz_process
 
 TAG = __name__
 
 MUSIC_CACHE = {}
 
+# 去除标点符号，保留文字和空白
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
 play_music_function_desc = {
     "type": "function",
     "function": {
@@ -74,44 +76,87 @@ def play_music(conn, song_name: str):
 
 def _extract_song_name(text):
     """从用户输入中提取歌名"""
-    for keyword in ["播放音乐"]:
-        if keyword in text:
-            parts = text.split(keyword)
-            if len(parts) > 1:
-                return parts[1].strip()
+    for keyword in ("播放音乐",):
+        # 只需取第一个关键词之后的片段，最多切分两次
+        parts = text.split(keyword, 2)
+        if len(parts) > 1:
+            return parts[1].strip()
     return None
 
 
-def _find_best_match(potential_song, music_files):
-    """查找最匹配的歌曲"""
-    best_match = None
-    highest_ratio = 0
-
-    for music_file in music_files:
-        song_name = os.path.splitext(music_file)[0]
-        ratio = difflib.SequenceMatcher(None, potential_song, song_name).ratio()
-        if ratio > highest_ratio and ratio > 0.4:
-            highest_ratio = ratio
-            best_match = music_file
-    return best_match
-
-
-def get_music_files(music_dir, music_ext):
-    music_dir = Path(music_dir)
+def _find_best_match(potential_song, music_files, music_file_names):
+    """查找最匹配的歌曲
+
+    music_file_names为与music_files一一对应、已去除扩展名并转为小写的文件名，
+    potential_song也应预先转为小写，匹配时不区分大小写
+    """
+    # 使用rapidfuzz的C++实现计算相似度，低于40分视为不匹配
+    match = fuzz_process.extractOne(
+        potential_song, music_file_names, scorer=fuzz.ratio, score_cutoff=40
+    )
+    return music_files[match[2]] if match else None
+
+
+def _scan_dir(dir_path, prefix, music_ext, dir_cache, seen, scan_start_ns):
+    """扫描单个目录，目录mtime未变化时直接复用上次的文件列表"""
+    mtime_ns = os.stat(dir_path).st_mtime_ns
+    seen.add(dir_path)
+    cached = dir_cache.get(dir_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1:]
+
+    files = []
+    names = []
+    subdirs = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            # d_type已随目录项返回，普通文件和目录的判断无需额外stat
+            # 与rglob一致，不进入符号链接指向的目录
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append((entry.path, prefix + entry.name + os.sep))
+                continue
+            name, ext = os.path.splitext(entry.name)
+            # 先比较扩展名，只有符号链接才需要为is_file发起stat
+            if ext.lower() in music_ext and entry.is_file():
+                files.append(prefix + entry.name)
+                names.append(prefix + name)
+    # mtime精度有限，扫描期间刚被修改的目录不缓存，下次重新列举
+    if mtime_ns < scan_start_ns - 1_000_000_000:
+        dir_cache[dir_path] = (mtime_ns, files, names, subdirs)
+    else:
+        dir_cache.pop(dir_path, None)
+    return files, names, subdirs
+
+
+def get_music_files(music_dir, music_ext, dir_cache=None):
+    """递归获取音乐文件列表
+
+    dir_cache保存各目录的mtime及其直接包含的文件，增删文件会更新所在目录的mtime，
+    因此刷新时只需重新列举发生变化的目录
+    """
+    if dir_cache is None:
+        dir_cache = {}
+    music_dir = os.path.abspath(music_dir)
+    music_ext = frozenset(music_ext)
     music_files = []
     music_file_names = []
-    for file in music_dir.rglob("*"):
-        # 判断是否是文件
-        if file.is_file():
-            # 获取文件扩展名
-            ext = file.suffix.lower()
-            # 判断扩展名是否在列表中
-            if ext in music_ext:
-                # 添加相对路径
-                music_files.append(str(file.relative_to(music_dir)))
-                music_file_names.append(
-                    os.path.splitext(str(file.relative_to(music_dir)))[0]
-                )
+    seen = set()
+    scan_start_ns = time.time_ns()
+    stack = [(music_dir, "")]
+    while stack:
+        dir_path, prefix = stack.pop()
+        try:
+            files, names, subdirs = _scan_dir(
+                dir_path, prefix, music_ext, dir_cache, seen, scan_start_ns
+            )
+        except OSError:
+            continue
+        music_files += files
+        music_file_names += names
+        stack.extend(reversed(subdirs))
+    # 清理已被删除的目录
+    for dir_path in dir_cache.keys() - seen:
+        del dir_cache[dir_path]
     return music_files, music_file_names
 
 
@@ -134,33 +179,43 @@ def initialize_music_handler(conn):
             MUSIC_CACHE["music_ext"] = (".mp3", ".wav", ".p3")
             MUSIC_CACHE["refresh_time"] = 60
         # 获取音乐文件列表
-        MUSIC_CACHE["music_files"], MUSIC_CACHE["music_file_names"] = get_music_files(
-            MUSIC_CACHE["music_dir"], MUSIC_CACHE["music_ext"]
-        )
-        MUSIC_CACHE["scan_time"] = time.time()
+        MUSIC_CACHE["dir_cache"] = {}
+        _refresh_music_files()
     return MUSIC_CACHE
 
 
+def _refresh_music_files():
+    """扫描音乐目录，同时预先生成小写歌名供模糊匹配使用"""
+    MUSIC_CACHE["music_files"], MUSIC_CACHE["music_file_names"] = get_music_files(
+        MUSIC_CACHE["music_dir"], MUSIC_CACHE["music_ext"], MUSIC_CACHE["dir_cache"]
+    )
+    MUSIC_CACHE["music_file_names_lc"] = [
+        name.lower() for name in MUSIC_CACHE["music_file_names"]
+    ]
+    MUSIC_CACHE["scan_time"] = time.time()
+
+
 async def handle_music_command(conn, text):
     initialize_music_handler(conn)
     global MUSIC_CACHE
 
     """处理音乐播放指令"""
-    clean_text = re.sub(r"[^\w\s]", "", text).strip()
+    clean_text = _PUNCT_RE.sub("", text).strip()
     conn.logger.bind(tag=TAG).debug(f"检查是否是音乐命令: {clean_text}")
 
     # 尝试匹配具体歌名
     if os.path.exists(MUSIC_CACHE["music_dir"]):
         if time.time() - MUSIC_CACHE["scan_time"] > MUSIC_CACHE["refresh_time"]:
-            # 刷新音乐文件列表
-            MUSIC_CACHE["music_files"], MUSIC_CACHE["music_file_names"] = (
-                get_music_files(MUSIC_CACHE["music_dir"], MUSIC_CACHE["music_ext"])
-            )
-            MUSIC_CACHE["scan_time"] = time.time()
+            # 增量刷新音乐文件列表，仅重新列举mtime发生变化的目录
+            _refresh_music_files()
 
         potential_song = _extract_song_name(clean_text)
         if potential_song:
-            best_match = _find_best_match(potential_song, MUSIC_CACHE["music_files"])
+            best_match = _find_best_match(
+                potential_song.lower(),
+                MUSIC_CACHE["music_files"],
+                MUSIC_CACHE["music_file_names_lc"],
+            )
             if best_match:
                 conn.logger.bind(tag=TAG).info(f"找到最匹配的歌曲: {best_match}")
                 await play_local_music(conn, specific_file=best_match)